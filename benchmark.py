@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+CPU benchmark harness for the matrix accelerator
+Repeated perf_counter_ns timing with warmup and summary statistics
+"""
+
+import statistics
+import threading
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Each timed sample runs the function enough times to take at least this long,
+# so microsecond-scale calls are not dominated by timer resolution
+MIN_SAMPLE_NS = 50_000
+
+
+def measure(func, *args, warmup=3, min_duration_ns=20_000_000, min_samples=7, max_samples=1000):
+    """
+    Time func(*args) and return median/p95/mean/stddev/min of the per-call time in ms.
+
+    After warmup calls, the number of calls per sample is calibrated to MIN_SAMPLE_NS,
+    then samples are taken until min_duration_ns of measured time and min_samples are
+    reached (or max_samples).
+    """
+    for _ in range(warmup):
+        func(*args)
+
+    # Calibrate calls per sample
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func(*args)
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= MIN_SAMPLE_NS or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < MIN_SAMPLE_NS / 10 else 2
+
+    samples = []
+    measured = 0
+    while len(samples) < max_samples and (len(samples) < min_samples or measured < min_duration_ns):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func(*args)
+        elapsed = time.perf_counter_ns() - start
+        measured += elapsed
+        samples.append(elapsed / number)
+
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        'median_ms': round(statistics.median(ordered) / 1e6, 6),
+        'p95_ms': round(p95 / 1e6, 6),
+        'mean_ms': round(statistics.fmean(ordered) / 1e6, 6),
+        'stddev_ms': round(statistics.stdev(ordered) / 1e6, 6) if len(ordered) > 1 else 0.0,
+        'min_ms': round(ordered[0] / 1e6, 6),
+        'samples': len(samples),
+        'calls_per_sample': number
+    }
+
+
+class CpuBenchmark:
+    """Runs the naive and NumPy CPU benchmarks on demand and caches the results per size"""
+
+    def __init__(self, accelerator):
+        self.accelerator = accelerator
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def cached(self, size):
+        """Return the stored benchmark for a size, or None if it has not been run"""
+        with self.lock:
+            return self.results.get(size)
+
+    def run(self, size, matrix_a, matrix_b):
+        """Benchmark both CPU methods for a size unless a result is already cached"""
+        result = self.cached(size)
+        if result is not None:
+            return result
+
+        logger.info(f"⏱️ Benchmarking CPU naive and NumPy paths for {size}x{size}")
+        # The naive baseline is pure Python, so it is timed on nested lists
+        lists = (np.asarray(matrix_a).tolist(), np.asarray(matrix_b).tolist())
+        result = {
+            'naive': measure(self.accelerator.compute_cpu_naive, *lists),
+            'optimized': measure(self.accelerator.compute_cpu_optimized, matrix_a, matrix_b)
+        }
+        with self.lock:
+            self.results.setdefault(size, result)
+        return result
+
+    def clear(self):
+        """Forget all stored benchmarks"""
+        with self.lock:
+            self.results.clear()
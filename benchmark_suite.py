@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the matrix accelerator
+Sweeps sizes, value ranges and backends, writes JSON/CSV reports and
+compares them against a saved baseline
+
+    python benchmark_suite.py --output report.json --csv report.csv
+    python benchmark_suite.py --baseline baseline.json --threshold 0.15
+    python benchmark_suite.py --check --simulators iverilog,verilator
+    python benchmark_suite.py --mode int8 --ranges -128:127 --backends numpy,verilog
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from benchmark import measure
+from designs import DESIGN_REGISTRY, design_candidates, systolic_design
+from matrix_input import stack_pairs
+from numeric_modes import (DEFAULT_MODE, NUMERIC_MODES, design_supports, encode_operands, decode_results,
+                           mode_product, wrap)
+
+# Metrics compared against a baseline; lower is better for all of them
+TIMED_METRICS = ['median_ms', 'compile_ms', 'simulation_ms', 'parse_ms', 'request_ms']
+
+# Differences below this many milliseconds are timer noise, whatever the ratio
+MIN_DELTA_MS = 0.005
+
+CSV_FIELDS = [
+    'id', 'backend', 'design', 'size', 'value_range', 'numeric_mode', 'correct',
+    'median_ms', 'p95_ms', 'stddev_ms', 'samples',
+    'compile_ms', 'simulation_ms', 'parse_ms', 'cycles',
+    'request_ms', 'request_p95_ms', 'macs_per_cycle'
+]
+
+
+def parse_range(text):
+    """Parse 'lo:hi' into an inclusive (lo, hi) tuple"""
+    lo, hi = text.split(':')
+    return int(lo), int(hi)
+
+
+def random_pair(size, value_range, rng):
+    """Random operand pair for a size with values drawn from an inclusive range"""
+    lo, hi = value_range
+    a = rng.integers(lo, hi + 1, size=(size, size)).tolist()
+    b = rng.integers(lo, hi + 1, size=(size, size)).tolist()
+    return a, b
+
+
+def run_entry(backend, design, size, value_range, numeric_mode=DEFAULT_MODE):
+    """Empty report row for one backend/size/range/mode combination"""
+    range_text = f"{value_range[0]}:{value_range[1]}"
+    # Default-mode ids are unchanged so older baselines still line up
+    mode_suffix = '' if numeric_mode == DEFAULT_MODE else f"/{numeric_mode}"
+    return {
+        'id': f"{backend}/{design}/{size}x{size}/{range_text}{mode_suffix}",
+        'backend': backend,
+        'design': design,
+        'size': size,
+        'value_range': range_text,
+        'numeric_mode': numeric_mode,
+        'correct': None,
+        'median_ms': None, 'p95_ms': None, 'stddev_ms': None, 'samples': None,
+        'compile_ms': None, 'simulation_ms': None, 'parse_ms': None, 'cycles': None,
+        'request_ms': None, 'request_p95_ms': None, 'macs_per_cycle': None
+    }
+
+
+def measure_request(client, matrix_a, matrix_b, stage_args, numeric_mode=DEFAULT_MODE):
+    """Median and p95 latency of /calculate through the Flask test client, cache disabled"""
+    payload = {'matrixA': matrix_a, 'matrixB': matrix_b, 'useCache': False, 'numericMode': numeric_mode}
+
+    def post():
+        response = client.post('/calculate', json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"/calculate returned {response.status_code}: {response.get_json()}")
+
+    stats = measure(post, **stage_args)
+    return stats['median_ms'], stats['p95_ms']
+
+
+def benchmark_verilog(accelerator, client, entry, design, matrix_a, matrix_b, stage_args, request=True,
+                      numeric_mode=DEFAULT_MODE):
+    """Compile, simulate, parse and (optionally) request timings for one hardware design"""
+    mode = NUMERIC_MODES[numeric_mode]
+    expected = mode_product(np.array(matrix_a, dtype=np.int64), np.array(matrix_b, dtype=np.int64), mode)
+
+    # Force a fresh compile so compile time is measured, not the cached binary
+    accelerator.compiled_designs.pop(design['key'], None)
+    start = time.perf_counter_ns()
+    binary, error = accelerator.get_compiled_design(design)
+    entry['compile_ms'] = round((time.perf_counter_ns() - start) / 1e6, 3)
+    if binary is None:
+        raise RuntimeError(f"Compilation failed for {entry['design']}: {error}")
+
+    operands = encode_operands(*stack_pairs([(matrix_a, matrix_b)]), design, mode)
+    sim_result = accelerator.run_simulation(binary, operands, design)
+    if sim_result.returncode != 0:
+        raise RuntimeError(f"Simulation failed for {entry['design']}: {sim_result.stderr}")
+    sim_stats = measure(accelerator.run_simulation, binary, operands, design, **stage_args)
+    parse_args = (sim_result.stdout, matrix_a, matrix_b, design, numeric_mode)
+    parse_stats = measure(accelerator.parse_simulation_output, *parse_args)
+
+    result, _, performance = accelerator.parse_simulation_output(*parse_args)
+    entry['correct'] = bool(np.array_equal(result, expected))
+    entry['cycles'] = performance['cycles']
+    entry['macs_per_cycle'] = accelerator.hardware_timing(design, 1, performance['cycles'])['macs_per_cycle']
+    entry['simulation_ms'] = sim_stats['median_ms']
+    entry['parse_ms'] = parse_stats['median_ms']
+    entry.update({key: sim_stats[key] for key in ('median_ms', 'p95_ms', 'stddev_ms', 'samples')})
+    if request:
+        entry['request_ms'], entry['request_p95_ms'] = measure_request(
+            client, matrix_a, matrix_b, stage_args, numeric_mode
+        )
+
+
+def design_holds(accelerator, design, mode, matrix_a, matrix_b):
+    """Whether a design computes this pair correctly in the mode (any in-range pair for wrapping modes)"""
+    if mode['acc_bits'] is None:
+        return bool(accelerator.design_accepts(design, matrix_a, matrix_b))
+    return design_supports(design, mode)
+
+
+def run_suite(sizes, value_ranges, backends, repeat=5, seed=0, numeric_mode=DEFAULT_MODE):
+    """Run every requested combination and return the report dict"""
+    # Imported here so that importing this module does not load Flask
+    import app_enhanced
+
+    app = app_enhanced.create_app()
+    accelerator = app_enhanced.accelerator
+
+    # Keep the per-request INFO logs of the app out of the benchmark output
+    logging.getLogger().setLevel(logging.WARNING)
+    client = app.test_client()
+    rng = np.random.default_rng(seed)
+    # Simulator runs and requests are slow, so they get fewer samples than the CPU paths
+    stage_args = {'warmup': 1, 'min_duration_ns': 0, 'min_samples': repeat, 'max_samples': repeat}
+    mode = NUMERIC_MODES[numeric_mode]
+    runs = []
+
+    try:
+        for size in sizes:
+            for value_range in value_ranges:
+                matrix_a, matrix_b = random_pair(size, value_range, rng)
+                expected = mode_product(np.array(matrix_a, dtype=np.int64), np.array(matrix_b, dtype=np.int64), mode)
+
+                if 'naive' in backends:
+                    entry = run_entry('naive', 'python', size, value_range, numeric_mode)
+                    stats = measure(accelerator.compute_cpu_naive, matrix_a, matrix_b)
+                    entry.update({key: stats[key] for key in ('median_ms', 'p95_ms', 'stddev_ms', 'samples')})
+                    naive = wrap(np.array(accelerator.compute_cpu_naive(matrix_a, matrix_b), dtype=np.int64),
+                                 mode['acc_bits'])
+                    entry['correct'] = bool(np.array_equal(naive, expected))
+                    runs.append(entry)
+
+                if 'numpy' in backends:
+                    entry = run_entry('numpy', 'numpy', size, value_range, numeric_mode)
+                    stats = measure(accelerator.compute_cpu_optimized, matrix_a, matrix_b, numeric_mode)
+                    entry.update({key: stats[key] for key in ('median_ms', 'p95_ms', 'stddev_ms', 'samples')})
+                    entry['correct'] = bool(np.array_equal(
+                        accelerator.compute_cpu_optimized(matrix_a, matrix_b, numeric_mode), expected
+                    ))
+                    # Sizes without a hardware design are served by NumPy, so the request belongs here
+                    if not design_candidates(size, mode):
+                        entry['request_ms'], entry['request_p95_ms'] = measure_request(
+                            client, matrix_a, matrix_b, stage_args, numeric_mode
+                        )
+                    runs.append(entry)
+
+                # The design the default policy picks for these operands, as /calculate would
+                candidates = design_candidates(size, mode)
+                if 'verilog' in backends and candidates:
+                    design = next((candidate for candidate in candidates
+                                   if design_holds(accelerator, candidate, mode, matrix_a, matrix_b)), None)
+                    if design is not None:
+                        entry = run_entry('verilog', design['key'], size, value_range, numeric_mode)
+                        benchmark_verilog(accelerator, client, entry, design, matrix_a, matrix_b, stage_args,
+                                          numeric_mode=numeric_mode)
+                        runs.append(entry)
+                    else:
+                        print(f"⏭️ No {size}x{size} design can hold range {value_range}, skipped", file=sys.stderr)
+
+                # The systolic array at every size, so array sizes can be compared directly
+                if 'systolic' in backends:
+                    design = systolic_design(size)
+                    if design_holds(accelerator, design, mode, matrix_a, matrix_b):
+                        entry = run_entry('systolic', design['key'], size, value_range, numeric_mode)
+                        benchmark_verilog(accelerator, client, entry, design, matrix_a, matrix_b, stage_args,
+                                          request=False, numeric_mode=numeric_mode)
+                        runs.append(entry)
+                    else:
+                        print(f"⏭️ {design['key']} cannot hold range {value_range}, skipped", file=sys.stderr)
+
+                # Every registered design of the size, so designs can be compared head to head
+                if 'designs' in backends:
+                    for design in DESIGN_REGISTRY.values():
+                        if design['size'] != size:
+                            continue
+                        if not design_holds(accelerator, design, mode, matrix_a, matrix_b):
+                            print(f"⏭️ {design['key']} cannot hold range {value_range}, skipped", file=sys.stderr)
+                            continue
+                        entry = run_entry('designs', design['key'], size, value_range, numeric_mode)
+                        benchmark_verilog(accelerator, client, entry, design, matrix_a, matrix_b, stage_args,
+                                          request=False, numeric_mode=numeric_mode)
+                        runs.append(entry)
+
+                print(f"📏 {size}x{size} range {value_range[0]}:{value_range[1]} done", file=sys.stderr)
+    finally:
+        app_enhanced.shutdown_app()
+
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'sizes': sizes,
+            'value_ranges': [f"{lo}:{hi}" for lo, hi in value_ranges],
+            'backends': backends,
+            'numeric_mode': numeric_mode,
+            'simulator': accelerator.simulator.name,
+            'repeat': repeat,
+            'seed': seed
+        },
+        'runs': runs
+    }
+
+
+def check_simulators(simulators, pairs_per_design=16, seed=0):
+    """
+    Run every registered design on each simulator backend against the NumPy reference,
+    then every design that serves a wrapping numeric mode over that mode's full input range.
+    Returns a list of failure messages; an empty list means every backend agreed.
+    """
+    from app_enhanced import EnhancedVerilogAccelerator
+    from simulators import BACKENDS
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = np.random.default_rng(seed)
+    sizes = sorted({design['size'] for design in DESIGN_REGISTRY.values()})
+    checks = [(design, DEFAULT_MODE) for design in DESIGN_REGISTRY.values()] + [
+        (design, mode_name) for mode_name, mode in NUMERIC_MODES.items() if mode_name != DEFAULT_MODE
+        for size in sizes for design in design_candidates(size, mode)
+    ]
+    failures = []
+
+    for name in simulators:
+        if not BACKENDS[name]().available():
+            print(f"⏭️ {name} not installed, skipped", file=sys.stderr)
+            continue
+        accelerator = EnhancedVerilogAccelerator(simulator=name)
+        try:
+            for design, mode_name in checks:
+                mode = NUMERIC_MODES[mode_name]
+                label = design['key'] if mode_name == DEFAULT_MODE else f"{design['key']}[{mode_name}]"
+                if mode['acc_bits'] is None:
+                    # Signed designs get negative operands; unsigned ones keep to their exact range
+                    value_range = (-8, 8) if design['signed'] else (0, 255)
+                else:
+                    # Wrapping modes are checked at the extremes of their input width
+                    value_range = (-(1 << (mode['input_bits'] - 1)), (1 << (mode['input_bits'] - 1)) - 1)
+                pairs = [random_pair(design['size'], value_range, rng) for _ in range(pairs_per_design)]
+                binary, error = accelerator.get_compiled_design(design)
+                if binary is None:
+                    failures.append(f"{name}/{label}: compilation failed: {error}")
+                    continue
+                a_stack, b_stack = stack_pairs(pairs)
+                sim_result = accelerator.run_simulation(binary, encode_operands(a_stack, b_stack, design, mode), design)
+                try:
+                    raw, _ = accelerator.parse_batch_output(sim_result.stdout, design, len(pairs))
+                except ValueError as e:
+                    failures.append(f"{name}/{label}: {e}")
+                    continue
+                results = decode_results(raw, a_stack, b_stack, design, mode)
+                expected = mode_product(a_stack, b_stack, mode)
+                mismatches = int((results != expected).any(axis=(1, 2)).sum())
+                status = '✅' if not mismatches else '❌'
+                print(f"{status} {name}/{label}: {len(pairs) - mismatches}/{len(pairs)} match")
+                if mismatches:
+                    failures.append(f"{name}/{label}: {mismatches} of {len(pairs)} results differ")
+        finally:
+            accelerator.shutdown(wait=True)
+            shutil.rmtree(accelerator.temp_dir, ignore_errors=True)
+
+    return failures
+
+
+def compare_reports(current, baseline, threshold):
+    """
+    Compare a report against a baseline. A timed metric regresses when it grows by more
+    than threshold (a fraction) and by more than MIN_DELTA_MS; cycles regress on any
+    increase; a run that was correct and no longer is always regresses.
+    """
+    baseline_runs = {run['id']: run for run in baseline.get('runs', [])}
+    regressions = []
+    improvements = []
+
+    for run in current['runs']:
+        base = baseline_runs.get(run['id'])
+        if base is None:
+            continue
+
+        if base.get('correct') and run.get('correct') is False:
+            regressions.append({'id': run['id'], 'metric': 'correct', 'baseline': True, 'current': False})
+
+        if base.get('cycles') is not None and run.get('cycles') is not None and run['cycles'] != base['cycles']:
+            change = {'id': run['id'], 'metric': 'cycles', 'baseline': base['cycles'], 'current': run['cycles']}
+            (regressions if run['cycles'] > base['cycles'] else improvements).append(change)
+
+        for metric in TIMED_METRICS:
+            old, new = base.get(metric), run.get(metric)
+            if not old or new is None or abs(new - old) < MIN_DELTA_MS:
+                continue
+            ratio = new / old
+            change = {'id': run['id'], 'metric': metric, 'baseline': old, 'current': new, 'ratio': round(ratio, 3)}
+            if ratio > 1 + threshold:
+                regressions.append(change)
+            elif ratio < 1 - threshold:
+                improvements.append(change)
+
+    return {
+        'verdict': 'regression' if regressions else 'pass',
+        'threshold': threshold,
+        'compared_runs': sum(1 for run in current['runs'] if run['id'] in baseline_runs),
+        'regressions': regressions,
+        'improvements': improvements
+    }
+
+
+def write_csv(path, runs):
+    """Write one CSV row per run"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for run in runs:
+            writer.writerow({field: run.get(field) for field in CSV_FIELDS})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the matrix accelerator backends')
+    parser.add_argument('--sizes', default='2,3,4,5,6,7,8', help='comma-separated matrix sizes')
+    parser.add_argument('--ranges', default='0:9,0:255', help='comma-separated lo:hi operand value ranges')
+    parser.add_argument('--backends', default='naive,numpy,verilog',
+                        help='subset of naive,numpy,verilog,systolic,designs (systolic runs the array at '
+                             'every size, designs every registered design of each size)')
+    parser.add_argument('--repeat', type=int, default=5, help='samples per simulator/request measurement')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random operands')
+    parser.add_argument('--output', default='benchmark_report.json', help='JSON report path')
+    parser.add_argument('--csv', help='optional CSV report path')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative slowdown that counts as a regression (0.10 = 10%%)')
+    parser.add_argument('--simulator', help='simulator backend for the sweep (default: auto-detect)')
+    parser.add_argument('--mode', default=DEFAULT_MODE, choices=list(NUMERIC_MODES),
+                        help='numeric mode of the sweep; narrow modes only run designs that support them')
+    parser.add_argument('--check', action='store_true',
+                        help='only check every design on each simulator against NumPy')
+    parser.add_argument('--simulators', default='iverilog,verilator',
+                        help='backends exercised by --check; missing ones are skipped')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        failures = check_simulators([name.strip() for name in args.simulators.split(',')], seed=args.seed)
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1 if failures else 0
+
+    if args.simulator:
+        # Read by the app's accelerator when it is created on import
+        os.environ['MATRIX_SIMULATOR'] = args.simulator
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    value_ranges = [parse_range(r) for r in args.ranges.split(',')]
+    backends = [b.strip() for b in args.backends.split(',')]
+
+    report = run_suite(sizes, value_ranges, backends, repeat=args.repeat, seed=args.seed, numeric_mode=args.mode)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['comparison'] = compare_reports(report, baseline, args.threshold)
+        comparison = report['comparison']
+        for change in comparison['regressions']:
+            print(f"❌ {change['id']} {change['metric']}: {change['baseline']} -> {change['current']}")
+        print(f"📊 Verdict: {comparison['verdict']} "
+              f"({len(comparison['regressions'])} regressions, {len(comparison['improvements'])} improvements "
+              f"over {comparison['compared_runs']} runs)")
+        if comparison['verdict'] == 'regression':
+            exit_code = 1
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Wrote {len(report['runs'])} runs to {args.output}")
+    if args.csv:
+        write_csv(args.csv, report['runs'])
+        print(f"💾 Wrote CSV to {args.csv}")
+
+    incorrect = [run['id'] for run in report['runs'] if run['correct'] is False]
+    if incorrect:
+        print(f"❌ Incorrect results: {', '.join(incorrect)}")
+        exit_code = 1
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
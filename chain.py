@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Matrix-chain planning for the matrix accelerator
+Orders a product A0×A1×…×An with the classic O(n³) dynamic program over a cost
+model of the backend that runs it. The model starts from a measurement of each
+backend and is refined by every stage it predicted.
+"""
+
+import hashlib
+import threading
+
+import numpy as np
+
+from benchmark import measure
+from numeric_modes import mode_product
+
+# Weight of the newest observation in the running cost estimates
+SMOOTHING = 0.3
+
+
+def plan_chain(dims, cost, keys=None):
+    """
+    Cheapest parenthesization of a chain whose matrix i is dims[i]×dims[i+1], where
+    cost(p, q, r) estimates one (p×q)·(q×r) product. With content keys per matrix, a
+    split whose halves are the same sub-chain (A·B·A·B) pays for that half once.
+    Returns (total cost, order), an order being a matrix index or a (left, right) pair.
+    """
+    n = len(dims) - 1
+    keys = keys or list(range(n))
+    best = [[0.0] * n for _ in range(n)]
+    split = [[None] * n for _ in range(n)]
+    for length in range(2, n + 1):
+        for i in range(n - length + 1):
+            j = i + length - 1
+            best[i][j] = float('inf')
+            for k in range(i, j):
+                right = 0.0 if keys[i:k + 1] == keys[k + 1:j + 1] else best[k + 1][j]
+                total = best[i][k] + right + cost(dims[i], dims[k + 1], dims[j + 1])
+                if total < best[i][j]:
+                    best[i][j], split[i][j] = total, k
+
+    def order(i, j):
+        if i == j:
+            return i
+        return order(i, split[i][j]), order(split[i][j] + 1, j)
+
+    return best[0][n - 1], order(0, n - 1)
+
+
+def left_to_right(n):
+    """The order of n matrices multiplied one after another, as repeated /calculate calls would"""
+    order = 0
+    for i in range(1, n):
+        order = (order, i)
+    return order
+
+
+def order_cost(order, dims, cost):
+    """Estimated cost of an order, without reuse. Returns (cost, (rows, cols) of its product)."""
+    if isinstance(order, int):
+        return 0.0, (dims[order], dims[order + 1])
+    left_cost, (p, q) = order_cost(order[0], dims, cost)
+    right_cost, (_, r) = order_cost(order[1], dims, cost)
+    return left_cost + right_cost + cost(p, q, r), (p, r)
+
+
+def describe_order(order):
+    """'((A0×A1)×A2)' style rendering of an order"""
+    if isinstance(order, int):
+        return f'A{order}'
+    return f'({describe_order(order[0])}×{describe_order(order[1])})'
+
+
+def stage_sequence(order, count):
+    """
+    The products of an order in evaluation order, as (left, right) operand numbers:
+    0..count-1 are the inputs and stage k's product is operand count + k
+    """
+    stages = []
+
+    def visit(node):
+        if isinstance(node, int):
+            return node
+        left, right = visit(node[0]), visit(node[1])
+        stages.append((left, right))
+        return count + len(stages) - 1
+
+    visit(order)
+    return stages
+
+
+def operand_key(matrix):
+    """Content hash of a chain input, shape included"""
+    digest = hashlib.sha256(f'{matrix.shape}|'.encode())
+    digest.update(matrix.tobytes())
+    return digest.hexdigest()
+
+
+def product_key(left_key, right_key):
+    """Content hash of a product from its operands' keys, so equal sub-chains share one"""
+    return hashlib.sha256(f'{left_key}×{right_key}'.encode()).hexdigest()
+
+
+class ChainCostModel:
+    """
+    Seconds per product for each backend. NumPy costs a fixed call overhead plus time per
+    multiply-accumulate; a hardware design costs a fixed overhead per simulation plus time
+    per tile job. Both are measured on first use and then follow the observed stages.
+    """
+
+    def __init__(self, jobs_per_simulation):
+        self.jobs_per_simulation = jobs_per_simulation
+        self.lock = threading.Lock()
+        # numeric mode -> {'call_seconds', 'mac_seconds'}
+        self.cpu = {}
+        # design key -> {'simulation_seconds', 'job_seconds'}
+        self.designs = {}
+
+    def cpu_cost(self, p, q, r, mode):
+        """Estimated seconds for a (p×q)·(q×r) NumPy product in a numeric mode"""
+        model = self._cpu_model(mode)
+        return model['call_seconds'] + p * q * r * model['mac_seconds']
+
+    def tile_jobs(self, p, q, r, tile_size):
+        """Block products a tiled (p×q)·(q×r) product runs"""
+        return -(-p // tile_size) * -(-q // tile_size) * -(-r // tile_size)
+
+    def design_cost(self, p, q, r, design, calibrate):
+        """
+        Estimated seconds for a (p×q)·(q×r) product tiled onto a design. calibrate(jobs)
+        runs that many tile jobs on the design and returns the seconds it took; it is
+        only called the first time the design is costed.
+        """
+        model = self._design_model(design, calibrate)
+        jobs = self.tile_jobs(p, q, r, design['size'])
+        simulations = -(-jobs // self.jobs_per_simulation)
+        return simulations * model['simulation_seconds'] + jobs * model['job_seconds']
+
+    def observe_cpu(self, mode, macs, seconds):
+        """Fold a measured NumPy product into the per-MAC estimate"""
+        with self.lock:
+            model = self.cpu.get(mode['name'])
+            if model is None or seconds <= model['call_seconds']:
+                return
+            observed = (seconds - model['call_seconds']) / macs
+            model['mac_seconds'] += SMOOTHING * (observed - model['mac_seconds'])
+
+    def observe_design(self, design_key, jobs, simulations, seconds):
+        """Fold a measured tiled product into the per-simulation and per-job estimates"""
+        with self.lock:
+            model = self.designs.get(design_key)
+            if model is None or not jobs or not simulations:
+                return
+            # Each estimate moves toward what the run implies given the other one
+            overhead = (seconds - jobs * model['job_seconds']) / simulations
+            if overhead > 0:
+                model['simulation_seconds'] += SMOOTHING * (overhead - model['simulation_seconds'])
+            per_job = (seconds - simulations * model['simulation_seconds']) / jobs
+            if per_job > 0:
+                model['job_seconds'] += SMOOTHING * (per_job - model['job_seconds'])
+
+    def snapshot(self):
+        """Current estimates, for responses"""
+        with self.lock:
+            return {
+                'cpu': {name: dict(model) for name, model in self.cpu.items()},
+                'designs': {key: dict(model) for key, model in self.designs.items()}
+            }
+
+    def _cpu_model(self, mode):
+        with self.lock:
+            model = self.cpu.get(mode['name'])
+            if model is None:
+                # A 1×1 product is all call overhead; a 128³ one is dominated by the MACs
+                one = np.ones((1, 1), dtype=np.int64)
+                block = np.ones((128, 128), dtype=np.int64)
+                call = measure(mode_product, one, one, mode, warmup=1, min_duration_ns=2_000_000)['median_ms'] / 1e3
+                full = measure(mode_product, block, block, mode, warmup=1, min_duration_ns=5_000_000)['median_ms'] / 1e3
+                model = self.cpu[mode['name']] = {
+                    'call_seconds': call,
+                    'mac_seconds': max(full - call, 1e-12) / 128 ** 3
+                }
+            return model
+
+    def _design_model(self, design, calibrate):
+        with self.lock:
+            model = self.designs.get(design['key'])
+            if model is None:
+                # The first run pays for compiling and starting the simulator; two timed
+                # runs of different sizes then separate per-simulation and per-job costs
+                calibrate(1)
+                one = calibrate(1)
+                many = calibrate(33)
+                job = max((many - one) / 32, 1e-9)
+                model = self.designs[design['key']] = {
+                    'simulation_seconds': max(one - job, 0.0),
+                    'job_seconds': job
+                }
+            return model
+
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Hardware design registry for the matrix accelerator
+Every Verilog multiplier the app can drive, with the size, bit widths, port style and
+latency it declares, and the policies that pick one for a request
+"""
+
+from matrix_input import MatrixInputError
+from numeric_modes import design_supports
+
+
+def fixed_design(size, module, data_width, multipliers, latency_cycles, architecture, parallelism):
+    """Hand-written design with one scalar port per element (a00, b00, c00, ...)"""
+    return {'key': module, 'module': module, 'sources': [f'{module}.v'], 'size': size,
+            'ports': 'scalar', 'parameters': {}, 'data_width': data_width,
+            'result_width': 32, 'signed': False, 'multipliers': multipliers,
+            'latency_cycles': latency_cycles, 'busy_port': True, 'restart': 'start',
+            'architecture': architecture, 'parallelism': parallelism}
+
+
+def systolic_design(size):
+    """Parameterized size×size systolic array of pe_mac8 elements with flattened A/B/C ports"""
+    return {'key': f'systolic_array_{size}', 'module': 'systolic_array',
+            'sources': ['systolic_array.v', 'pe_mac8.v'], 'size': size,
+            'ports': 'flat', 'parameters': {'N': size}, 'data_width': 8,
+            'result_width': 16, 'signed': True, 'multipliers': size * size,
+            'latency_cycles': 3 * size + 2, 'busy_port': True, 'restart': 'start',
+            'architecture': f'Systolic array of {size}×{size} pe_mac8 processing elements',
+            'parallelism': f'Systolic array of {size * size} pe_mac8 elements'}
+
+
+def sequential_design():
+    """
+    matmul8x8_8bit_seq: one pe_mac8 stepping through all 512 products of an 8×8 multiply.
+    The file carries its own pe_mac8 (with different ports from pe_mac8.v), so it is
+    compiled alone. It has no busy output and only clears done from idle, so the
+    testbench resets it between jobs.
+    """
+    return {'key': 'matmul8x8_8bit_seq', 'module': 'matmul8x8_8bit_seq',
+            'sources': ['matmul8x8_8bit_seq.v'], 'size': 8,
+            'ports': 'flat', 'parameters': {}, 'data_width': 8,
+            'result_width': 16, 'signed': True, 'multipliers': 1,
+            'latency_cycles': 642, 'busy_port': False, 'restart': 'reset',
+            'architecture': 'Single pe_mac8 MAC unit stepping through all 512 products',
+            'parallelism': 'One multiply per cycle (sequential)'}
+
+
+# Every design requests can run on. 'multipliers' is the number of multiplies issued per
+# clock cycle; 'latency_cycles' the start-to-done cycles the testbench measures per job.
+DESIGN_REGISTRY = {design['key']: design for design in [
+    fixed_design(2, 'matrix_mult_2x2_simple', 16, 8, 4,
+                 'Parallel processing elements with combinational logic', 'Dedicated hardware parallelism'),
+    fixed_design(3, 'matrix_mult_3x3', 16, 27, 3,
+                 'Parallel processing elements with combinational logic', 'Dedicated hardware parallelism'),
+    fixed_design(4, 'matrix_mult_4x4', 16, 64, 3,
+                 'Parallel processing elements with combinational logic', 'Dedicated hardware parallelism'),
+    fixed_design(8, 'matrix_mult_8x8_fast', 32, 512, 3,
+                 'Pipelined parallel processing with 64 multipliers and register banks',
+                 '8-bit MAC units with sequential processing'),
+    *[systolic_design(size) for size in range(2, 9)],
+    sequential_design(),
+]}
+
+# How a design is chosen when a request does not name one: 'fastest' takes the lowest
+# declared latency, 'narrowest' the design whose widths match the operands most closely
+DESIGN_POLICIES = {
+    'fastest': lambda d: (d['latency_cycles'], d['data_width'], d['result_width']),
+    'narrowest': lambda d: (d['data_width'], d['result_width'], d['latency_cycles']),
+}
+DEFAULT_POLICY = 'fastest'
+
+
+def design_candidates(size, mode, policy=DEFAULT_POLICY):
+    """
+    Registered designs for a size that can serve the numeric mode, most preferred first.
+    In int64 every design of the size is a candidate; whether it is exact for particular
+    operands is decided per pair by the caller.
+    """
+    designs = [design for design in DESIGN_REGISTRY.values()
+               if design['size'] == size and (mode['acc_bits'] is None or design_supports(design, mode))]
+    return sorted(designs, key=DESIGN_POLICIES[policy])
+
+
+def resolve_designs(size, mode, choice=None):
+    """
+    Candidate designs for a request's 'design' field: a policy name, a registered design
+    key, or 'numpy' for no hardware. Choices that cannot work are an input error.
+    """
+    choice = choice or DEFAULT_POLICY
+    if choice in DESIGN_POLICIES:
+        return design_candidates(size, mode, choice)
+    if choice == 'numpy':
+        return []
+    design = DESIGN_REGISTRY.get(choice)
+    if design is None:
+        raise MatrixInputError(f"Unknown design '{choice}', expected a policy "
+                               f"({', '.join(DESIGN_POLICIES)}), 'numpy' or one of {', '.join(DESIGN_REGISTRY)}")
+    if design['size'] != size:
+        raise MatrixInputError(f"Design {choice} multiplies {design['size']}x{design['size']} matrices, "
+                               f"not {size}x{size}")
+    if mode['acc_bits'] is not None and not design_supports(design, mode):
+        raise MatrixInputError(f"Design {choice} cannot compute {mode['name']} products")
+    return [design]
+
+
+def describe_design(design):
+    """Public view of a registered design for listings"""
+    return {
+        'size': design['size'],
+        'module': design['module'],
+        'ports': design['ports'],
+        'data_width': design['data_width'],
+        'result_width': design['result_width'],
+        'signed': design['signed'],
+        'multipliers': design['multipliers'],
+        'latency_cycles': design['latency_cycles'],
+        'architecture': design['architecture']
+    }
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Asynchronous job store for the matrix accelerator
+Runs submitted requests on a small thread pool and keeps their status, progress
+and results in memory until they expire
+"""
+
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Job states; a job moves forward through them and never back
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class JobStoreFullError(Exception):
+    """Raised when too many jobs are unfinished to accept another one"""
+
+
+class Job:
+    """One submitted request: its status, progress counters and final response"""
+
+    def __init__(self, kind, id_prefix=''):
+        self.id = f"{id_prefix}{uuid.uuid4().hex}"
+        self.kind = kind
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.http_status = None
+        self.error = None
+        # Bumped on every change so streams know when there is something new to send
+        self.version = 0
+
+    @property
+    def finished(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self, include_result=True):
+        job = {
+            'job_id': self.id,
+            'type': self.kind,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'progress': {
+                'done': self.done,
+                'total': self.total,
+                'percent': round(self.done / self.total * 100, 1) if self.total else (100.0 if self.finished else 0.0)
+            },
+            'version': self.version
+        }
+        if self.finished:
+            job['http_status'] = self.http_status
+            job['error'] = self.error
+            if include_result:
+                job['result'] = self.result
+        return job
+
+
+class JobStore:
+    """
+    In-memory jobs run on `workers` background threads.
+
+    Finished jobs are kept for `ttl` seconds; submit() raises JobStoreFullError
+    once `max_pending` jobs are queued or running so the web layer can answer 503.
+    Job ids start with `id_prefix`, which lets several processes tell whose job it is.
+    """
+
+    def __init__(self, workers=2, max_pending=32, max_jobs=1000, ttl=600.0, id_prefix=''):
+        self.workers = workers
+        self.id_prefix = id_prefix
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.jobs = OrderedDict()
+        self.changed = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job-worker')
+        self.draining = False
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def submit(self, kind, func, *args):
+        """
+        Queue func(*args, progress) and return the new Job. func returns (response dict,
+        HTTP status); progress(done, total) may be called any number of times while it runs.
+        """
+        with self.changed:
+            self._purge()
+            if self.draining:
+                self.rejected += 1
+                raise JobStoreFullError("Shutting down, not accepting new jobs")
+            pending = sum(1 for job in self.jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                self.rejected += 1
+                raise JobStoreFullError(f"Too many unfinished jobs ({pending})")
+            job = Job(kind, self.id_prefix)
+            self.jobs[job.id] = job
+            self.submitted += 1
+
+        self.executor.submit(self._run, job, func, args)
+        logger.info(f"📥 Queued {kind} job {job.id}")
+        return job
+
+    def _run(self, job, func, args):
+        self._update(job, status=RUNNING, started_at=time.time())
+
+        def progress(done, total):
+            self._update(job, done=done, total=total)
+
+        try:
+            response, http_status = func(*args, progress)
+            error = None if response.get('success') else response.get('error', 'Job failed')
+        except Exception as e:
+            logger.error(f"❌ Job {job.id} crashed: {e}")
+            response, http_status, error = None, 500, f"Server error: {str(e)}"
+
+        status = FAILED if error else SUCCEEDED
+        if status == SUCCEEDED and job.total:
+            self._update(job, done=job.total)
+        self._update(job, status=status, result=response, http_status=http_status,
+                     error=error, finished_at=time.time())
+        with self.changed:
+            if status == SUCCEEDED:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+        logger.info(f"📤 Job {job.id} {status}")
+
+    def _update(self, job, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.version += 1
+            self.changed.notify_all()
+
+    def _purge(self):
+        """Drop expired finished jobs, then the oldest finished ones past max_jobs. Caller holds the lock."""
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished and now - job.finished_at > self.ttl:
+                del self.jobs[job_id]
+                self.expired += 1
+        for job_id, job in list(self.jobs.items()):
+            if len(self.jobs) < self.max_jobs:
+                break
+            if job.finished:
+                del self.jobs[job_id]
+                self.expired += 1
+
+    def get(self, job_id, include_result=True):
+        """Snapshot of a job as a dict, or None if it is unknown or has expired"""
+        with self.changed:
+            self._purge()
+            job = self.jobs.get(job_id)
+            return job.to_dict(include_result) if job else None
+
+    def wait(self, job_id, version, timeout):
+        """
+        Block until the job changes past `version` or `timeout` seconds pass.
+        Returns the latest snapshot (without result), or None if the job is gone.
+        """
+        deadline = time.monotonic() + timeout
+        with self.changed:
+            while True:
+                job = self.jobs.get(job_id)
+                if job is None or job.version > version:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.changed.wait(remaining)
+            return job.to_dict(include_result=False) if job else None
+
+    def stats(self):
+        """Snapshot of job counts by state and lifetime counters"""
+        with self.changed:
+            states = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self.jobs.values():
+                states[job.status] += 1
+            return {
+                'workers': self.workers,
+                'stored': len(self.jobs),
+                'max_pending': self.max_pending,
+                'ttl_seconds': self.ttl,
+                'draining': self.draining,
+                'states': states,
+                'submitted': self.submitted,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'expired': self.expired,
+            }
+
+    def drain(self, timeout):
+        """
+        Refuse new jobs and wait up to `timeout` seconds for queued and running ones to
+        finish. Returns the number still unfinished.
+        """
+        deadline = time.monotonic() + timeout
+        with self.changed:
+            self.draining = True
+            while True:
+                pending = sum(1 for job in self.jobs.values() if not job.finished)
+                remaining = deadline - time.monotonic()
+                if not pending or remaining <= 0:
+                    return pending
+                self.changed.wait(remaining)
+
+    def shutdown(self, wait=False):
+        """Stop accepting work; running jobs finish unless the process exits first"""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
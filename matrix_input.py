@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Operand ingest for the matrix accelerator
+Parses JSON matrices once into contiguous int64 arrays and validates shape, element
+type and range with vectorized checks. A matrix may also be sent sparse, as a CSR or
+COO object ({"format": "csr", "shape": [r, c], "data", "indices", "indptr"} or
+{"format": "coo", "shape": [r, c], "data", "row", "col"}).
+"""
+
+import numpy as np
+
+INT64_MAX = np.iinfo(np.int64).max
+
+# Entries a sparse matrix may expand to; bounds the dense array built from a small body
+MAX_SPARSE_ENTRIES = 1 << 22
+
+
+class MatrixInputError(ValueError):
+    """Raised when a submitted matrix is ragged, non-integer, empty or out of range"""
+
+
+def is_missing(value):
+    """Whether a matrix field is absent or empty; works for nested lists and arrays alike"""
+    return value is None or (hasattr(value, '__len__') and len(value) == 0)
+
+
+def to_matrix(value, name='matrix'):
+    """Convert a nested list, array or CSR/COO object into a C-contiguous int64 2-D array"""
+    if isinstance(value, dict):
+        return from_sparse(value, name)
+    array = _to_array(value, name)
+    if array.ndim != 2 or array.shape[1] == 0:
+        raise MatrixInputError(f"{name} must be a non-empty rectangular list of rows")
+    return _to_int64(array, name)
+
+
+def to_matrices(value, name='matrices'):
+    """Convert a list of equally sized matrices (or a 3-D array) into a (count, n, m) int64 array"""
+    array = _to_array(value, name)
+    if array.ndim != 3 or 0 in array.shape:
+        raise MatrixInputError(f"{name} must be a non-empty list of equally sized matrices")
+    return _to_int64(array, name)
+
+
+def _to_array(value, name):
+    if is_missing(value):
+        raise MatrixInputError(f"{name} is missing")
+    try:
+        return np.asarray(value)
+    except (ValueError, TypeError):
+        # NumPy refuses ragged nesting outright
+        raise MatrixInputError(f"{name} must be a rectangular list of rows")
+
+
+def _to_int64(array, name):
+    """Check the element type and range, then view or copy as C-contiguous int64"""
+    kind = array.dtype.kind
+    if kind == 'i':
+        pass
+    elif kind == 'u':
+        if array.max() > INT64_MAX:
+            raise MatrixInputError(f"{name} values must fit in 64-bit signed integers")
+    elif kind == 'f':
+        # JSON numbers such as 3.0 are accepted when they are whole
+        if not np.isfinite(array).all() or (array != np.floor(array)).any():
+            raise MatrixInputError(f"{name} must contain integers only")
+        if np.abs(array).max() >= 2.0 ** 63:
+            raise MatrixInputError(f"{name} values must fit in 64-bit signed integers")
+    elif kind == 'O' and all(isinstance(v, int) and not isinstance(v, bool) for v in array.flat):
+        # Python ints too large for int64 land in an object array
+        raise MatrixInputError(f"{name} values must fit in 64-bit signed integers")
+    else:
+        raise MatrixInputError(f"{name} must contain integers only")
+
+    # Little-endian int64 input (e.g. a binary request body) is used in place
+    return np.ascontiguousarray(array, dtype=np.int64)
+
+
+def from_sparse(value, name='matrix'):
+    """Expand a CSR or COO object into a dense int64 array; duplicate COO entries are summed"""
+    kind = str(value.get('format', '')).lower()
+    if kind not in ('csr', 'coo'):
+        raise MatrixInputError(f"{name} sparse format must be 'csr' or 'coo'")
+    shape = value.get('shape')
+    if not isinstance(shape, (list, tuple)) or len(shape) != 2 \
+            or not all(isinstance(n, int) and not isinstance(n, bool) and n > 0 for n in shape):
+        raise MatrixInputError(f"{name} shape must be two positive integers")
+    rows, cols = shape
+    if rows * cols > MAX_SPARSE_ENTRIES:
+        raise MatrixInputError(f"{name} is limited to {MAX_SPARSE_ENTRIES} entries")
+
+    data = _sparse_field(value, 'data', name, integers=True)
+    if kind == 'csr':
+        indices = _sparse_field(value, 'indices', name)
+        indptr = _sparse_field(value, 'indptr', name)
+        if len(indptr) != rows + 1 or indptr[0] != 0 or (np.diff(indptr) < 0).any() \
+                or indptr[-1] != len(indices):
+            raise MatrixInputError(f"{name} indptr must rise from 0 to len(indices) over {rows + 1} entries")
+        row = np.repeat(np.arange(rows), np.diff(indptr))
+        col = indices
+    else:
+        row = _sparse_field(value, 'row', name)
+        col = _sparse_field(value, 'col', name)
+    if not len(data) == len(row) == len(col):
+        raise MatrixInputError(f"{name} data and index arrays must have the same length")
+    if len(row) and (row.min() < 0 or row.max() >= rows or col.min() < 0 or col.max() >= cols):
+        raise MatrixInputError(f"{name} indices out of range for shape {rows}x{cols}")
+
+    dense = np.zeros((rows, cols), dtype=np.int64)
+    np.add.at(dense, (row, col), data)
+    return dense
+
+
+def _sparse_field(value, field, name, integers=False):
+    """One 1-D array of a sparse object; index arrays must be integers too"""
+    raw = value.get(field)
+    if raw is None:
+        raise MatrixInputError(f"{name} sparse {field} is missing")
+    try:
+        array = np.asarray(raw)
+    except (ValueError, TypeError):
+        raise MatrixInputError(f"{name} sparse {field} must be a flat list")
+    if array.ndim != 1:
+        raise MatrixInputError(f"{name} sparse {field} must be a flat list")
+    if not len(array):
+        return np.zeros(0, dtype=np.int64)
+    return _to_int64(array, f"{name} sparse {field}" if integers else f"{name} {field}")
+
+
+def magnitude(matrix):
+    """Largest absolute value in an int64 array, as a Python int (safe for INT64_MIN)"""
+    return max(abs(int(matrix.max())), abs(int(matrix.min())))
+
+
+def check_shapes(matrix_a, matrix_b, names=('matrixA', 'matrixB')):
+    """Check that the inner dimensions of A×B agree"""
+    if matrix_a.shape[-1] != matrix_b.shape[-2]:
+        raise MatrixInputError(
+            f"Cannot multiply {matrix_a.shape[-2]}x{matrix_a.shape[-1]} {names[0]} "
+            f"by {matrix_b.shape[-2]}x{matrix_b.shape[-1]} {names[1]}"
+        )
+
+
+def check_product(matrix_a, matrix_b, names=('matrixA', 'matrixB')):
+    """Check that A×B is defined and that its exact sums cannot overflow int64"""
+    check_shapes(matrix_a, matrix_b, names)
+    if matrix_a.shape[-1] * magnitude(matrix_a) * magnitude(matrix_b) > INT64_MAX:
+        raise MatrixInputError("Values too large for exact 64-bit products")
+
+
+def stack_pairs(pairs):
+    """Stack equally sized (A, B) pairs into two (count, n, n) int64 arrays"""
+    a_stack = np.stack([np.asarray(a, dtype=np.int64) for a, _ in pairs])
+    b_stack = np.stack([np.asarray(b, dtype=np.int64) for _, b in pairs])
+    return a_stack, b_stack
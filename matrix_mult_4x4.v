@@ -1,111 +1,94 @@
-// 4x4 Matrix Multiplication Unit
-// Uses 16 PEs arranged in a 4x4 grid
-
-module matrix_mult_4x4 #(
-    parameter DATA_WIDTH = 16
-) (
+// 4x4 Matrix Multiplier - Standard Verilog Compatible
+module matrix_mult_4x4(
     input clk,
-    input rst_n,
-    input enable,
+    input rst,
     input start,
-    
-    // Matrix A inputs (4x4) - flattened array
-    input signed [DATA_WIDTH-1:0] matrix_a [0:15],
-    
-    // Matrix B inputs (4x4) - flattened array
-    input signed [DATA_WIDTH-1:0] matrix_b [0:15],
-    
-    // Result matrix C (4x4) - flattened array
-    output reg signed [2*DATA_WIDTH-1:0] matrix_c [0:15],
-    output reg done
+    // Matrix A elements
+    input [15:0] a00, a01, a02, a03,
+    input [15:0] a10, a11, a12, a13,
+    input [15:0] a20, a21, a22, a23,
+    input [15:0] a30, a31, a32, a33,
+    // Matrix B elements
+    input [15:0] b00, b01, b02, b03,
+    input [15:0] b10, b11, b12, b13,
+    input [15:0] b20, b21, b22, b23,
+    input [15:0] b30, b31, b32, b33,
+    // Matrix C elements (result)
+    output reg [31:0] c00, c01, c02, c03,
+    output reg [31:0] c10, c11, c12, c13,
+    output reg [31:0] c20, c21, c22, c23,
+    output reg [31:0] c30, c31, c32, c33,
+    // Control signals
+    output reg done,
+    output reg busy
 );
 
+    // State machine
     reg [2:0] state;
-    reg [2:0] cycle_count;
-    reg pe_enable;
-    reg pe_clear;
     
-    wire signed [DATA_WIDTH-1:0] pe_a_in [0:15];
-    wire signed [DATA_WIDTH-1:0] pe_b_in [0:15];
-    wire signed [2*DATA_WIDTH-1:0] pe_c_out [0:15];
-    wire pe_valid [0:15];
-
-    // PE array instantiation
-    genvar i;
-    generate
-        for (i = 0; i < 16; i = i + 1) begin : pe_array
-            processing_element #(.DATA_WIDTH(DATA_WIDTH)) pe (
-                .clk(clk),
-                .rst_n(rst_n),
-                .enable(pe_enable),
-                .clear_acc(pe_clear),
-                .a_in(pe_a_in[i]),
-                .b_in(pe_b_in[i]),
-                .c_out(pe_c_out[i]),
-                .valid(pe_valid[i])
-            );
-        end
-    endgenerate
-
-    // State machine
-    always @(posedge clk or negedge rst_n) begin
-        if (!rst_n) begin
-            state <= 0;
-            cycle_count <= 0;
-            pe_enable <= 0;
-            pe_clear <= 1;
-            done <= 0;
+    // States
+    localparam IDLE = 3'b000;
+    localparam COMPUTE = 3'b001;
+    localparam DONE = 3'b010;
+    
+    always @(posedge clk or posedge rst) begin
+        if (rst) begin
+            // Reset all outputs
+            c00 <= 32'h0; c01 <= 32'h0; c02 <= 32'h0; c03 <= 32'h0;
+            c10 <= 32'h0; c11 <= 32'h0; c12 <= 32'h0; c13 <= 32'h0;
+            c20 <= 32'h0; c21 <= 32'h0; c22 <= 32'h0; c23 <= 32'h0;
+            c30 <= 32'h0; c31 <= 32'h0; c32 <= 32'h0; c33 <= 32'h0;
+            done <= 1'b0;
+            busy <= 1'b0;
+            state <= IDLE;
         end else begin
             case (state)
-                0: begin // IDLE
-                    if (start && enable) begin
-                        state <= 1;
-                        pe_clear <= 1;
-                        cycle_count <= 0;
-                        done <= 0;
+                IDLE: begin
+                    done <= 1'b0;
+                    if (start) begin
+                        busy <= 1'b1;
+                        state <= COMPUTE;
                     end
                 end
                 
-                1: begin // CLEAR
-                    pe_clear <= 0;
-                    pe_enable <= 1;
-                    state <= 2;
+                COMPUTE: begin
+                    // Row 0
+                    c00 <= a00*b00 + a01*b10 + a02*b20 + a03*b30;
+                    c01 <= a00*b01 + a01*b11 + a02*b21 + a03*b31;
+                    c02 <= a00*b02 + a01*b12 + a02*b22 + a03*b32;
+                    c03 <= a00*b03 + a01*b13 + a02*b23 + a03*b33;
+                    // Row 1
+                    c10 <= a10*b00 + a11*b10 + a12*b20 + a13*b30;
+                    c11 <= a10*b01 + a11*b11 + a12*b21 + a13*b31;
+                    c12 <= a10*b02 + a11*b12 + a12*b22 + a13*b32;
+                    c13 <= a10*b03 + a11*b13 + a12*b23 + a13*b33;
+                    // Row 2
+                    c20 <= a20*b00 + a21*b10 + a22*b20 + a23*b30;
+                    c21 <= a20*b01 + a21*b11 + a22*b21 + a23*b31;
+                    c22 <= a20*b02 + a21*b12 + a22*b22 + a23*b32;
+                    c23 <= a20*b03 + a21*b13 + a22*b23 + a23*b33;
+                    // Row 3
+                    c30 <= a30*b00 + a31*b10 + a32*b20 + a33*b30;
+                    c31 <= a30*b01 + a31*b11 + a32*b21 + a33*b31;
+                    c32 <= a30*b02 + a31*b12 + a32*b22 + a33*b32;
+                    c33 <= a30*b03 + a31*b13 + a32*b23 + a33*b33;
+                    
+                    state <= DONE;
                 end
                 
-                2: begin // COMPUTE
-                    cycle_count <= cycle_count + 1;
-                    if (cycle_count == 4) begin
-                        state <= 3;
-                        pe_enable <= 0;
+                DONE: begin
+                    done <= 1'b1;
+                    busy <= 1'b0;
+                    if (!start) begin
+                        state <= IDLE;
                     end
                 end
                 
-                3: begin // DONE
-                    for (integer j = 0; j < 16; j = j + 1) begin
-                        matrix_c[j] <= pe_c_out[j];
-                    end
-                    done <= 1;
-                    state <= 0;
+                default: begin
+                    state <= IDLE;
                 end
             endcase
         end
     end
 
-    // Input assignment for matrix multiplication
-    integer row, col, k;
-    always @(*) begin
-        for (row = 0; row < 4; row = row + 1) begin
-            for (col = 0; col < 4; col = col + 1) begin
-                if (cycle_count < 4) begin
-                    k = cycle_count;
-                    pe_a_in[row*4 + col] = matrix_a[row*4 + k];
-                    pe_b_in[row*4 + col] = matrix_b[k*4 + col];
-                end else begin
-                    pe_a_in[row*4 + col] = 0;
-                    pe_b_in[row*4 + col] = 0;
-                end
-            end
-        end
-    end
-
 endmodule
\ No newline at end of file
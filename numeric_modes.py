@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Numeric modes for the matrix accelerator
+Each mode fixes the input width and the accumulator width of a multiplication. The
+narrow modes wrap like the hardware accumulators do (two's complement, no saturation),
+so simulated and CPU results agree bit for bit; int64 is the exact reference.
+"""
+
+import numpy as np
+
+from matrix_input import MatrixInputError, check_product, check_shapes
+
+# input_bits: signed width every operand must fit; acc_bits: accumulator width the sums
+# wrap at (None = exact); dtype: NumPy type whose matmul wraps the same way
+NUMERIC_MODES = {
+    'int8': {'name': 'int8', 'input_bits': 8, 'acc_bits': 16, 'dtype': np.int16,
+             'description': 'int8 inputs, 16-bit wrapping accumulator (pe_mac8)'},
+    'int16': {'name': 'int16', 'input_bits': 16, 'acc_bits': 32, 'dtype': np.int32,
+              'description': 'int16 inputs, 32-bit wrapping accumulator'},
+    'int32': {'name': 'int32', 'input_bits': 32, 'acc_bits': 32, 'dtype': np.int32,
+              'description': 'int32 inputs, 32-bit wrapping accumulator'},
+    'int64': {'name': 'int64', 'input_bits': 64, 'acc_bits': None, 'dtype': np.int64,
+              'description': 'exact 64-bit reference; hardware only where it is exact'},
+}
+
+# Requests that do not name a mode get exact results, as before modes existed
+DEFAULT_MODE = 'int64'
+
+
+def get_mode(name=None):
+    """Mode dict for a name (default int64); unknown names are an input error"""
+    mode = NUMERIC_MODES.get(name or DEFAULT_MODE)
+    if mode is None:
+        raise MatrixInputError(f"Unknown numeric mode '{name}', expected one of {', '.join(NUMERIC_MODES)}")
+    return mode
+
+
+def wrap(values, bits):
+    """Wrap int64 values to signed two's complement of the given width, vectorized"""
+    if bits is None or bits >= 64:
+        return values
+    half = np.int64(1 << (bits - 1))
+    return ((values + half) & np.int64((1 << bits) - 1)) - half
+
+
+def check_operands(matrix_a, matrix_b, mode, names=('matrixA', 'matrixB')):
+    """
+    Check that A×B is defined for the mode: in int64 the exact sums must fit, in the
+    wrapping modes every operand must fit the mode's input width
+    """
+    if mode['acc_bits'] is None:
+        check_product(matrix_a, matrix_b, names)
+        return
+    check_shapes(matrix_a, matrix_b, names)
+    low, high = -(1 << (mode['input_bits'] - 1)), (1 << (mode['input_bits'] - 1)) - 1
+    for matrix, name in zip((matrix_a, matrix_b), names):
+        if matrix.min() < low or matrix.max() > high:
+            raise MatrixInputError(f"{name} values must fit in {mode['name']} ([{low}, {high}])")
+
+
+def mode_product(matrix_a, matrix_b, mode):
+    """
+    A×B with the mode's semantics: the matmul runs in the accumulator's dtype, so every
+    sum wraps exactly as the hardware accumulator would. Works on (count, n, n) stacks.
+    """
+    dtype = mode['dtype']
+    return np.matmul(np.asarray(matrix_a).astype(dtype, copy=False),
+                     np.asarray(matrix_b).astype(dtype, copy=False)).astype(np.int64)
+
+
+def design_supports(design, mode):
+    """Whether a design computes the mode's wrapped products for every in-range operand"""
+    if mode['acc_bits'] is None:
+        return False
+    return design['data_width'] >= mode['input_bits'] and design['result_width'] >= mode['acc_bits']
+
+
+def operand_offset(design, mode):
+    """
+    Zero point added to both operands before they reach the design. Unsigned ports
+    narrower than the result zero-extend, which breaks two's complement products, so
+    signed values are shifted into [0, 2^input_bits) first; other designs need none.
+    """
+    if mode['acc_bits'] is None or design['signed'] or design['data_width'] >= design['result_width']:
+        return 0
+    return 1 << (mode['input_bits'] - 1)
+
+
+def encode_operands(a_stack, b_stack, design, mode):
+    """(A, B) stacks as sent to the design for this mode"""
+    offset = operand_offset(design, mode)
+    if not offset:
+        return a_stack, b_stack
+    return a_stack + offset, b_stack + offset
+
+
+def decode_results(raw, a_stack, b_stack, design, mode):
+    """
+    Turn a design's raw (count, n, n) results for encoded operands back into the mode's
+    products. With zero point h, (A+h)(B+h) = AB + h·rowsum(A) + h·colsum(B) + n·h², so
+    the offset costs O(n²) per pair to undo; the wrap then matches the accumulator.
+    """
+    offset = operand_offset(design, mode)
+    if offset:
+        n = a_stack.shape[-1]
+        raw = (raw - offset * a_stack.sum(axis=-1)[..., :, None]
+               - offset * b_stack.sum(axis=-2)[..., None, :] - n * offset * offset)
+    return wrap(raw, mode['acc_bits'])
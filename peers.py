@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Request forwarding between the worker processes of a pre-forked server
+Jobs live in the memory of the worker that accepted them, so their ids carry the
+owner's worker id and other workers forward job requests to it over a private
+Unix socket per worker
+"""
+
+import http.client
+import os
+import socket
+
+# Headers that describe one connection rather than the response, so are not forwarded
+HOP_BY_HOP = {'connection', 'keep-alive', 'transfer-encoding', 'te', 'trailer', 'upgrade',
+              'proxy-authenticate', 'proxy-authorization'}
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection to a server listening on a Unix domain socket"""
+
+    def __init__(self, socket_path, timeout=60.0):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def worker_socket(peer_dir, worker_id):
+    """Path of the private socket a worker listens on"""
+    return os.path.join(peer_dir, f'{worker_id}.sock')
+
+
+def job_owner(job_id):
+    """Worker id encoded in a job id ('w1-3f2a...'), or None for ids without one"""
+    owner, separator, _ = job_id.partition('-')
+    return owner if separator else None
+
+
+def forward(socket_path, method, path, headers, timeout=60.0):
+    """
+    Send a request to the worker behind socket_path. Returns (status, headers, body
+    chunks); the chunks are yielded as they arrive so event streams stay live.
+    """
+    connection = UnixHTTPConnection(socket_path, timeout)
+    try:
+        connection.request(method, path, headers=headers)
+        upstream = connection.getresponse()
+    except Exception:
+        connection.close()
+        raise
+
+    def body():
+        try:
+            while True:
+                chunk = upstream.read1(65536)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            connection.close()
+
+    response_headers = [(name, value) for name, value in upstream.getheaders()
+                        if name.lower() not in HOP_BY_HOP]
+    return upstream.status, response_headers, body()
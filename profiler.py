@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Per-request profiling for the matrix accelerator
+Nested perf_counter_ns spans collected only while a request is being profiled,
+exportable as Chrome trace JSON (chrome://tracing, Perfetto)
+"""
+
+import contextvars
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: no subprocess CPU figures
+    resource = None
+
+# Profile of the request running in this context, and the span new spans nest under.
+# The scheduler copies the context into its workers so spans there join the same trace.
+_profile = contextvars.ContextVar('profile', default=None)
+_parent = contextvars.ContextVar('profile_parent', default=None)
+
+
+class Profile:
+    """Spans recorded for one request, from any thread that shares its context"""
+
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.spans = []
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def add(self, name, start_ns, end_ns, parent=None, span_id=None, args=None):
+        with self.lock:
+            self.spans.append({
+                'id': span_id or next(self.ids),
+                'parent': parent,
+                'name': name,
+                'thread': threading.current_thread().name,
+                'start_us': round((start_ns - self.start_ns) / 1000, 3),
+                'duration_us': round((end_ns - start_ns) / 1000, 3),
+                'args': args or {}
+            })
+
+    def to_dict(self):
+        """Inline form returned in responses: total time and spans ordered by start"""
+        end_ns = self.end_ns or time.perf_counter_ns()
+        with self.lock:
+            spans = sorted(self.spans, key=lambda s: (s['start_us'], s['id']))
+        return {'total_ms': round((end_ns - self.start_ns) / 1e6, 4), 'spans': spans}
+
+
+class _NullSpan:
+    """Returned by span() when nothing is being profiled; entering it does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profile, name, args, children):
+        self.profile = profile
+        self.name = name
+        self.args = args
+        self.children = children and resource is not None
+        self.id = next(profile.ids)
+
+    def __enter__(self):
+        self.parent = _parent.get()
+        self.token = _parent.set(self.id)
+        if self.children:
+            self.usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end_ns = time.perf_counter_ns()
+        if self.children:
+            # Only children that have exited and been waited for are counted, and the
+            # counters are process-wide, so concurrent requests can inflate the figure
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            self.args['child_user_ms'] = round((usage.ru_utime - self.usage.ru_utime) * 1000, 3)
+            self.args['child_sys_ms'] = round((usage.ru_stime - self.usage.ru_stime) * 1000, 3)
+        _parent.reset(self.token)
+        self.profile.add(self.name, self.start_ns, end_ns, self.parent, self.id, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach extra arguments to the span before it closes"""
+        self.args.update(args)
+
+
+def span(name, children=False, **args):
+    """
+    Context manager timing a named span in the current request's profile. With
+    children=True the CPU time of subprocesses reaped inside it is recorded too.
+    Returns a shared no-op object when the request is not being profiled.
+    """
+    profile = _profile.get()
+    if profile is None:
+        return NULL_SPAN
+    return _Span(profile, name, args, children)
+
+
+def profiling_active():
+    """Whether the current context is being profiled"""
+    return _profile.get() is not None
+
+
+def add_span(name, start_ns, end_ns, **args):
+    """Record a span measured elsewhere, e.g. time spent waiting in a queue"""
+    profile = _profile.get()
+    if profile is not None:
+        profile.add(name, start_ns, end_ns, _parent.get(), args=args)
+
+
+@contextmanager
+def profiling(enabled=True):
+    """Collect spans from this context into a new Profile (yielded); yields None when disabled"""
+    if not enabled:
+        yield None
+        return
+    profile = Profile()
+    profile_token = _profile.set(profile)
+    parent_token = _parent.set(None)
+    try:
+        yield profile
+    finally:
+        profile.end_ns = time.perf_counter_ns()
+        _parent.reset(parent_token)
+        _profile.reset(profile_token)
+
+
+def process_cpu_seconds(pid):
+    """User and system CPU seconds of a running process from /proc, or None where unavailable"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        ticks = os.sysconf('SC_CLK_TCK')
+        return int(fields[11]) / ticks, int(fields[12]) / ticks
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_rss_bytes(pid='self'):
+    """Resident memory of a process (default: this one) from /proc, or None where unavailable"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def chrome_trace(profile, metadata=None):
+    """Convert an inline profile dict into Chrome trace event JSON"""
+    thread_ids = {}
+    events = []
+    for s in profile['spans']:
+        tid = thread_ids.setdefault(s['thread'], len(thread_ids) + 1)
+        events.append({
+            'name': s['name'],
+            'cat': 'matrix',
+            'ph': 'X',
+            'ts': s['start_us'],
+            'dur': s['duration_us'],
+            'pid': 1,
+            'tid': tid,
+            'args': s['args']
+        })
+    for name, tid in thread_ids.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}})
+    trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    if metadata:
+        trace['otherData'] = metadata
+    return trace
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Result cache for the matrix accelerator
+LRU cache with a per-entry TTL, keyed by operand content and the design used
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ResultCache:
+    """Thread-safe LRU cache of multiplication results with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries=4096, ttl=600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(kind, design, matrix_a, matrix_b):
+        """Hash the operands together with their shapes, the design and the kind of entry"""
+        a_np = np.ascontiguousarray(matrix_a, dtype=np.int64)
+        b_np = np.ascontiguousarray(matrix_b, dtype=np.int64)
+        digest = hashlib.sha256(f"{kind}|{design}|{a_np.shape}|{b_np.shape}|".encode())
+        digest.update(a_np.tobytes())
+        digest.update(b_np.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or an expired entry"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting least recently used entries past max_entries"""
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept"""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Snapshot of size and hit/miss/eviction counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+            }
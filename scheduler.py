@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Simulation scheduler for the matrix accelerator
+Runs simulator jobs on a fixed pool of workers fed from a bounded queue
+"""
+
+import collections
+import contextvars
+import os
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from profiler import add_span
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerFullError(Exception):
+    """Raised when the job queue is full and a new job is rejected"""
+
+
+class SchedulerTimeoutError(Exception):
+    """Raised when a job waited too long in the queue or overran its time limit"""
+
+
+class SimulationScheduler:
+    """
+    Fixed pool of worker threads, each driving at most one simulator subprocess.
+
+    Jobs are plain callables. submit() never blocks: when the queue is full the
+    job is rejected with SchedulerFullError so the web layer can answer 503 fast.
+    Each job runs in a copy of the submitter's context, so a request's profile
+    follows it onto the worker. run_bounded() fans one caller's jobs out with a
+    cap on how many of them are queued or running at a time.
+    """
+
+    def __init__(self, num_workers=None, max_queue=None, job_timeout=60.0, queue_timeout=30.0):
+        self.num_workers = num_workers or os.cpu_count() or 4
+        self.max_queue = max_queue or self.num_workers * 4
+        self.job_timeout = job_timeout
+        self.queue_timeout = queue_timeout
+        self.jobs = queue.Queue(maxsize=self.max_queue)
+        # Enough of one caller's jobs in flight to keep every worker busy, never a full queue
+        self.window = max(1, min(self.num_workers * 2, self.max_queue))
+
+        self.stats_lock = threading.Lock()
+        self.active = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.dequeued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+        self.workers = []
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f'sim-worker-{i}', daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        logger.info(f"🧵 Simulation scheduler: {self.num_workers} workers, queue limit {self.max_queue}")
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a job and return its Future; raises SchedulerFullError if the queue is full"""
+        return self._enqueue(func, args, kwargs, block=False)
+
+    def _enqueue(self, func, args, kwargs, block):
+        """Queue a job, waiting up to queue_timeout for room if block is set"""
+        future = Future()
+        future.queue_wait = 0.0
+        try:
+            self.jobs.put((future, time.perf_counter(), contextvars.copy_context(), func, args, kwargs),
+                          block=block, timeout=self.queue_timeout if block else None)
+        except queue.Full:
+            with self.stats_lock:
+                self.rejected += 1
+            raise SchedulerFullError(f"Simulation queue full ({self.max_queue} jobs waiting)")
+        with self.stats_lock:
+            self.submitted += 1
+        return future
+
+    def run(self, func, *args, **kwargs):
+        """Submit a job and wait for it. Returns (result, seconds spent queued)."""
+        return self.result(self.submit(func, *args, **kwargs))
+
+    def run_bounded(self, jobs, window=None):
+        """
+        Run (func, *args) jobs with at most `window` (default self.window) of them queued or
+        running at once, yielding (result, seconds spent queued) in submission order. Only
+        the first job can be refused with SchedulerFullError; once admitted, the caller
+        waits for room instead. Jobs that have not started are cancelled when the caller
+        stops early, so close() the generator (or use contextlib.closing) on error paths.
+        """
+        window = window or self.window
+        in_flight = collections.deque()
+        admitted = False
+        try:
+            for func, *args in jobs:
+                while len(in_flight) >= window:
+                    yield self.result(in_flight.popleft())
+                while True:
+                    try:
+                        in_flight.append(self._enqueue(func, args, {}, block=admitted and not in_flight))
+                        break
+                    except SchedulerFullError:
+                        # Other callers filled the queue: make room by finishing our own jobs
+                        if not in_flight:
+                            raise
+                        yield self.result(in_flight.popleft())
+                admitted = True
+            while in_flight:
+                yield self.result(in_flight.popleft())
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def result(self, future):
+        """Wait for a submitted job. Returns (result, seconds spent queued)."""
+        try:
+            result = future.result(timeout=self.queue_timeout + self.job_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self.stats_lock:
+                self.timed_out += 1
+            raise SchedulerTimeoutError(f"Simulation did not finish within {self.job_timeout}s")
+        return result, future.queue_wait
+
+    def _worker_loop(self):
+        """Take jobs off the queue until a shutdown sentinel arrives"""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            future, enqueued_at, context, func, args, kwargs = job
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                now = time.perf_counter()
+                wait = now - enqueued_at
+                future.queue_wait = wait
+                context.run(add_span, 'queue_wait', int(enqueued_at * 1e9), int(now * 1e9))
+                with self.stats_lock:
+                    self.dequeued += 1
+                    self.total_wait += wait
+                    self.max_wait = max(self.max_wait, wait)
+                    self.last_wait = wait
+
+                # The caller has most likely given up on a job this stale
+                if wait > self.queue_timeout:
+                    with self.stats_lock:
+                        self.timed_out += 1
+                    future.set_exception(SchedulerTimeoutError(f"Job waited {wait:.1f}s in queue"))
+                    continue
+
+                with self.stats_lock:
+                    self.active += 1
+                try:
+                    future.set_result(context.run(func, *args, **kwargs))
+                    with self.stats_lock:
+                        self.completed += 1
+                except Exception as e:
+                    with self.stats_lock:
+                        self.failed += 1
+                    future.set_exception(e)
+                finally:
+                    with self.stats_lock:
+                        self.active -= 1
+            finally:
+                self.jobs.task_done()
+
+    def stats(self):
+        """Snapshot of queue depth, worker usage and queue wait times"""
+        with self.stats_lock:
+            return {
+                'workers': self.num_workers,
+                'active_jobs': self.active,
+                'queue_depth': self.jobs.qsize(),
+                'queue_limit': self.max_queue,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'avg_wait_ms': round(self.total_wait / self.dequeued * 1000, 3) if self.dequeued else 0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'last_wait_ms': round(self.last_wait * 1000, 3),
+            }
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the jobs already queued have run"""
+        for _ in self.workers:
+            self.jobs.put(None)
+        if wait:
+            for worker in self.workers:
+                worker.join()
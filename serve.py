@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Production server for the matrix accelerator
+Pre-forks worker processes that share one listening socket and a read-only cache of
+precompiled designs. Every worker warms all designs before it accepts connections,
+drains in-flight requests and jobs on SIGTERM, and removes its temp directory on exit;
+the supervisor reports each worker's cold-start time and memory and restarts crashed ones.
+
+    python serve.py --workers 4 --port 5001
+    python serve.py --workers 2 --design-cache /var/cache/matrix-designs --report startup.json
+    python serve.py --precompile /var/cache/matrix-designs
+"""
+
+import argparse
+import json
+import os
+import selectors
+import shutil
+import signal
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import logging
+
+from werkzeug.serving import make_server
+
+import app_enhanced
+from app_enhanced import EnhancedVerilogAccelerator
+from peers import worker_socket
+
+logger = logging.getLogger('serve')
+
+# Extra seconds a worker gets past the drain timeout before it is killed
+KILL_GRACE_SECONDS = 10.0
+
+
+def precompile(cache_dir, simulator=None):
+    """Build every design into cache_dir once, before any worker starts. Returns {key: error or None}."""
+    builder = EnhancedVerilogAccelerator(simulator=simulator, resident_workers=0)
+    start = time.perf_counter()
+    try:
+        errors = builder.precompile(cache_dir)
+    finally:
+        # No threads may outlive this: the workers are forked from this process next
+        builder.shutdown(wait=True)
+        shutil.rmtree(builder.temp_dir, ignore_errors=True)
+    for key, error in errors.items():
+        if error:
+            logger.error(f"❌ Precompiling {key} failed, workers will compile it themselves: {error}")
+    logger.info(f"📦 Precompiled {sum(1 for e in errors.values() if not e)}/{len(errors)} designs "
+                f"into {cache_dir} in {time.perf_counter() - start:.1f}s")
+    return errors
+
+
+def run_worker(index, listener, args, design_cache, peer_dir, report):
+    """
+    Body of one worker process: warm up, then serve the shared listener until SIGTERM,
+    drain, clean up. Writes one JSON line with its start-up report to `report`.
+    """
+    forked = time.perf_counter()
+    worker_id = f'w{index}'
+    stopping = threading.Event()
+    servers = []
+
+    def stop(signum, frame):
+        if stopping.is_set():
+            return
+        stopping.set()
+        logger.info(f"🛑 Worker {worker_id} draining")
+        # shutdown() waits for serve_forever() to return, so it cannot run on the serving thread
+        if servers:
+            threading.Thread(target=servers[0].shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    app = app_enhanced.create_app(design_cache=design_cache, warm_up=True, simulator=args.simulator,
+                                  worker_id=worker_id, peer_dir=peer_dir)
+    public = make_server(args.host, args.port, app, threaded=True, fd=listener.fileno())
+    peer = make_server(f'unix://{worker_socket(peer_dir, worker_id)}', 0, app, threaded=True)
+    threading.Thread(target=peer.serve_forever, daemon=True).start()
+    servers.append(public)
+
+    status = app_enhanced.server_status()
+    report.write(json.dumps({
+        'worker': worker_id,
+        'pid': os.getpid(),
+        'cold_start_ms': round((time.perf_counter() - forked) * 1000, 3),
+        'warm_up_errors': {key: entry['error'] for key, entry in (status['warm_up'] or {}).items()
+                           if 'error' in entry},
+        'memory': status['memory']
+    }) + '\n')
+    report.flush()
+
+    # A signal during warm-up had no server to stop yet
+    if not stopping.is_set():
+        public.serve_forever()
+    app_enhanced.drain_app(args.drain_timeout)
+    peer.shutdown()
+    app_enhanced.shutdown_app()
+
+
+class Supervisor:
+    """Forks the workers, collects their start-up reports, restarts crashed ones and stops them all on a signal"""
+
+    def __init__(self, listener, args, design_cache, peer_dir):
+        self.listener = listener
+        self.args = args
+        self.design_cache = design_cache
+        self.peer_dir = peer_dir
+        self.selector = selectors.DefaultSelector()
+        # pid -> {'index', 'ready'}
+        self.workers = {}
+        self.reports = {}
+        self.stopping = False
+        self.restarts = 0
+
+    def spawn(self, index):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 1
+            try:
+                with os.fdopen(write_fd, 'w') as report:
+                    run_worker(index, self.listener, self.args, self.design_cache, self.peer_dir, report)
+                code = 0
+            except BaseException:
+                logger.exception(f"❌ Worker w{index} failed")
+            finally:
+                # Never return into the supervisor's code in the child
+                os._exit(code)
+
+        os.close(write_fd)
+        self.selector.register(os.fdopen(read_fd), selectors.EVENT_READ, pid)
+        self.workers[pid] = {'index': index, 'ready': False}
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def read_reports(self, timeout):
+        for key, _ in self.selector.select(timeout):
+            line = key.fileobj.readline()
+            if not line:
+                self.selector.unregister(key.fileobj)
+                key.fileobj.close()
+                continue
+            report = json.loads(line)
+            if key.data in self.workers:
+                self.workers[key.data]['ready'] = True
+            self.reports[report['worker']] = report
+            memory = report['memory']
+            logger.info(f"👷 Worker {report['worker']} (pid {report['pid']}) ready in {report['cold_start_ms']:.0f} ms, "
+                        f"{mb(memory['rss_bytes'])} MB resident + {memory['simulators']} simulators "
+                        f"using {mb(memory['simulator_rss_bytes'])} MB")
+            for design, error in report['warm_up_errors'].items():
+                logger.warning(f"⚠️ Worker {report['worker']} could not warm {design}: {error}")
+            if len(self.reports) == self.args.workers and all(w['ready'] for w in self.workers.values()):
+                self.log_summary()
+
+    def reap(self):
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                logger.info(f"👋 Worker w{worker['index']} exited ({code})")
+            elif not worker['ready']:
+                # Failing before it was ready would fail again; give up rather than loop
+                logger.error(f"❌ Worker w{worker['index']} exited ({code}) during start-up, stopping")
+                self.stopping = True
+            else:
+                logger.warning(f"♻️ Worker w{worker['index']} exited ({code}), restarting it")
+                self.restarts += 1
+                self.spawn(worker['index'])
+
+    def run(self):
+        """Serve until SIGTERM/SIGINT, then drain every worker. Returns the start-up report."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.args.workers):
+            self.spawn(index)
+
+        deadline = None
+        while self.workers:
+            if self.stopping and deadline is None:
+                logger.info(f"🛑 Stopping {len(self.workers)} workers")
+                for pid in self.workers:
+                    os.kill(pid, signal.SIGTERM)
+                deadline = time.monotonic() + self.args.drain_timeout + KILL_GRACE_SECONDS
+            if deadline is not None and time.monotonic() > deadline:
+                for pid in self.workers:
+                    logger.error(f"💀 Killing worker pid {pid}, still running after the drain timeout")
+                    os.kill(pid, signal.SIGKILL)
+                deadline = float('inf')
+            self.read_reports(0.5)
+            self.reap()
+        return self.startup_report()
+
+    def startup_report(self):
+        reports = list(self.reports.values())
+        cold_starts = [report['cold_start_ms'] for report in reports]
+        return {
+            'workers': reports,
+            'restarts': self.restarts,
+            'cold_start_ms': {
+                'median': statistics.median(cold_starts),
+                'max': max(cold_starts)
+            } if cold_starts else None,
+            'rss_bytes_per_worker': {
+                'median': statistics.median(report['memory']['rss_bytes'] or 0 for report in reports),
+                'max': max(report['memory']['rss_bytes'] or 0 for report in reports)
+            } if reports else None
+        }
+
+    def log_summary(self):
+        report = self.startup_report()
+        logger.info(f"🚀 Serving on http://{self.args.host}:{self.args.port} with {self.args.workers} workers; "
+                    f"cold start median {report['cold_start_ms']['median']:.0f} ms, "
+                    f"max {report['cold_start_ms']['max']:.0f} ms; "
+                    f"median {mb(report['rss_bytes_per_worker']['median'])} MB resident per worker")
+        if self.args.report:
+            with open(self.args.report, 'w') as f:
+                json.dump(report, f, indent=2)
+
+
+def mb(value):
+    return round((value or 0) / 2 ** 20, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the matrix accelerator with pre-forked workers')
+    parser.add_argument('--host', default='0.0.0.0', help='address to listen on')
+    parser.add_argument('--port', type=int, default=5001, help='port to listen on')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='worker processes')
+    parser.add_argument('--design-cache',
+                        help='directory of precompiled designs, shared read-only by the workers '
+                             '(default: a temporary one built at start-up)')
+    parser.add_argument('--precompile', metavar='DIR', help='only build the design cache in DIR and exit')
+    parser.add_argument('--simulator', help='simulator backend (default: auto-detect)')
+    parser.add_argument('--drain-timeout', type=float, default=30.0,
+                        help='seconds a worker waits for in-flight requests and jobs on SIGTERM')
+    parser.add_argument('--report', help='write the workers\' cold-start and memory report to this JSON file')
+    args = parser.parse_args(argv)
+
+    if args.precompile:
+        errors = precompile(args.precompile, args.simulator)
+        return 1 if any(errors.values()) else 0
+
+    # Worker sockets and, unless one is given, the design cache live here until exit
+    runtime_dir = tempfile.mkdtemp(prefix='matrix_serve_')
+    try:
+        design_cache = args.design_cache or os.path.join(runtime_dir, 'designs')
+        precompile(design_cache, args.simulator)
+
+        listener = socket.create_server((args.host, args.port), backlog=128)
+        supervisor = Supervisor(listener, args, design_cache, runtime_dir)
+        report = supervisor.run()
+        listener.close()
+        logger.info(f"🏁 Stopped after {supervisor.restarts} worker restarts")
+        return 0 if report['workers'] else 1
+    finally:
+        shutil.rmtree(runtime_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
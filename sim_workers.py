@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Resident simulator workers for the matrix accelerator
+Long-lived simulator processes in +SERVE mode, fed operand records over stdin
+"""
+
+import os
+import queue
+import selectors
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import logging
+
+from profiler import process_cpu_seconds
+
+logger = logging.getLogger(__name__)
+
+# Line the testbench prints after the results of every record (and every ping)
+BATCH_END = b"BATCH_END\n"
+
+
+class WorkerCrashedError(Exception):
+    """Raised when a resident simulator exits or stops answering mid-record"""
+
+
+class SimulatorWorker:
+    """One resident simulator process with its stdin/stdout pipes kept open"""
+
+    def __init__(self, command, workdir, timeout=60.0):
+        self.command = command
+        self.timeout = timeout
+        self.workspace = tempfile.mkdtemp(prefix='worker_', dir=workdir)
+        self.process = None
+        self.jobs_done = 0
+        self.started_at = None
+        self.last_used = None
+
+    def start(self):
+        """Launch the simulator process"""
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=self.workspace,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self.jobs_done = 0
+        self.started_at = self.last_used = time.monotonic()
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def request(self, record, jobs, timeout=None):
+        """Send one record and return everything printed before its BATCH_END marker"""
+        try:
+            self.process.stdin.write(record.encode())
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerCrashedError(f"Simulator stdin closed: {e}")
+
+        output = self._read_until_end(time.monotonic() + (timeout or self.timeout))
+        self.jobs_done += jobs
+        self.last_used = time.monotonic()
+        return output
+
+    def ping(self, timeout=5.0):
+        """Health check: an empty record must be answered with BATCH_END"""
+        try:
+            self.request("0\n", 0, timeout)
+            return True
+        except WorkerCrashedError:
+            return False
+
+    def _read_until_end(self, deadline):
+        """Read stdout until the BATCH_END marker; raises WorkerCrashedError on EOF or timeout"""
+        chunks = []
+        tail = b""
+        fd = self.process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    raise WorkerCrashedError("Simulator did not answer in time")
+                data = os.read(fd, 65536)
+                if not data:
+                    raise WorkerCrashedError(f"Simulator exited with code {self.process.wait()}")
+                chunks.append(data)
+                tail = (tail + data)[-len(BATCH_END):]
+                if tail == BATCH_END:
+                    output = b"".join(chunks)
+                    return output[:-len(BATCH_END)].decode()
+
+    def stop(self):
+        """Close stdin so the testbench finishes, killing it if it does not"""
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def close(self):
+        """Stop the process for good and remove its workspace"""
+        self.stop()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+
+class WorkerPool:
+    """
+    Up to `size` resident workers for one compiled design, started on demand.
+
+    Workers are pinged before reuse after `health_interval` idle seconds, replaced
+    when they crash, and recycled after `max_jobs` operand sets.
+    """
+
+    def __init__(self, command, workdir, size=2, max_jobs=10000, timeout=60.0, health_interval=30.0):
+        self.command = command
+        self.workdir = workdir
+        self.size = size
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.workers = []
+        self.closed = False
+
+        self.started = 0
+        self.restarts = 0
+        self.recycled = 0
+        self.records = 0
+
+    def run(self, record, jobs, usage=None):
+        """
+        Send a record to an idle worker, retrying once on a fresh worker if it crashes.
+        If a usage dict is given, the simulator CPU seconds spent on the record are put in it.
+        """
+        for attempt in range(2):
+            worker = self._checkout()
+            before = process_cpu_seconds(worker.process.pid) if usage is not None else None
+            try:
+                output = worker.request(record, jobs)
+            except WorkerCrashedError as e:
+                logger.warning(f"♻️ Simulator worker crashed ({e}), restarting")
+                with self.lock:
+                    self.restarts += 1
+                self._replace(worker)
+                if attempt:
+                    raise
+                continue
+            with self.lock:
+                self.records += 1
+            if before is not None:
+                after = process_cpu_seconds(worker.process.pid)
+                if after is not None:
+                    usage['user_s'] = after[0] - before[0]
+                    usage['sys_s'] = after[1] - before[1]
+            self._checkin(worker)
+            return output
+
+    def _checkout(self):
+        """Take an idle worker, starting a new one while below the pool size"""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Worker pool is shut down")
+            if self.idle.empty() and len(self.workers) < self.size:
+                worker = SimulatorWorker(self.command, self.workdir, self.timeout)
+                self.workers.append(worker)
+                self.started += 1
+                worker.start()
+                return worker
+
+        try:
+            worker = self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError(f"No simulator worker free within {self.timeout}s")
+
+        healthy = worker.alive()
+        if healthy and time.monotonic() - worker.last_used > self.health_interval:
+            healthy = worker.ping()
+        if not healthy:
+            logger.warning("♻️ Simulator worker failed its health check, restarting")
+            with self.lock:
+                self.restarts += 1
+            worker.restart()
+        return worker
+
+    def _checkin(self, worker):
+        """Return a worker to the idle set, recycling it once it has run max_jobs"""
+        if self.closed:
+            worker.close()
+            return
+        if worker.jobs_done >= self.max_jobs:
+            with self.lock:
+                self.recycled += 1
+            worker.restart()
+        self.idle.put(worker)
+
+    def _replace(self, worker):
+        """Swap a crashed worker's process for a fresh one and make it available again"""
+        if self.closed:
+            worker.close()
+            return
+        worker.restart()
+        self.idle.put(worker)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'workers': len(self.workers),
+                'alive': sum(1 for w in self.workers if w.alive()),
+                'idle': self.idle.qsize(),
+                'limit': self.size,
+                'records': self.records,
+                'started': self.started,
+                'restarts': self.restarts,
+                'recycled': self.recycled,
+                'max_jobs': self.max_jobs
+            }
+
+    def pids(self):
+        """Process ids of the live workers"""
+        with self.lock:
+            return [w.process.pid for w in self.workers if w.alive()]
+
+    def shutdown(self):
+        """Stop every worker; busy ones are stopped when they are checked back in"""
+        with self.lock:
+            self.closed = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
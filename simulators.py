@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Simulator backends for the matrix accelerator
+Each backend compiles a testbench plus design sources into something that can be
+launched with +OPERANDS/+COUNT plusargs; Verilator is preferred when installed
+"""
+
+import os
+import shutil
+import subprocess
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatorBackend:
+    """Compiles generated testbenches and builds the command line that runs them"""
+
+    name = None
+
+    def available(self):
+        """Whether the tools this backend needs are installed"""
+        raise NotImplementedError
+
+    def compile(self, workdir, top, sources, output):
+        """Compile sources (relative to workdir) with top as the root module. Returns (binary, error)."""
+        raise NotImplementedError
+
+    def binary_path(self, output):
+        """Path of the binary compile() builds for an output name"""
+        raise NotImplementedError
+
+    def command(self, binary, plusargs):
+        """Command line that runs a compiled binary with the given plusargs"""
+        raise NotImplementedError
+
+    def remove(self, binary):
+        """Delete a compiled binary and anything built alongside it"""
+        if os.path.exists(binary):
+            os.remove(binary)
+
+
+class IverilogBackend(SimulatorBackend):
+    """Icarus Verilog: iverilog compiles to a .vvp image that vvp interprets"""
+
+    name = 'iverilog'
+
+    def available(self):
+        return shutil.which('iverilog') is not None and shutil.which('vvp') is not None
+
+    def binary_path(self, output):
+        return f"{output}.vvp"
+
+    def compile(self, workdir, top, sources, output):
+        binary = self.binary_path(output)
+        # The testbench is the only uninstantiated module, so iverilog finds the root itself
+        result = subprocess.run(
+            ['iverilog', '-o', binary] + sources,
+            cwd=workdir,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            return None, result.stderr
+        return binary, None
+
+    def command(self, binary, plusargs):
+        return ['vvp', binary] + plusargs
+
+
+class VerilatorBackend(SimulatorBackend):
+    """Verilator: translates the design to C++ and builds a native simulator executable"""
+
+    name = 'verilator'
+
+    def __init__(self, executable=None):
+        # VERILATOR points at a differently named install, e.g. a wrapper script
+        self.executable = executable or os.environ.get('VERILATOR', 'verilator')
+
+    def available(self):
+        return shutil.which(self.executable) is not None
+
+    def binary_path(self, output):
+        return os.path.join(f"{output}.obj", 'simv')
+
+    def compile(self, workdir, top, sources, output):
+        build_dir = os.path.dirname(self.binary_path(output))
+        result = subprocess.run(
+            [self.executable, '--binary', '--timing', '-j', '0',
+             '-Wno-fatal', '-Wno-lint', '-Wno-style',
+             '--top-module', top, '-Mdir', build_dir, '-o', 'simv'] + sources,
+            cwd=workdir,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            return None, result.stderr
+        return self.binary_path(output), None
+
+    def command(self, binary, plusargs):
+        return [binary] + plusargs
+
+    def remove(self, binary):
+        shutil.rmtree(os.path.dirname(binary), ignore_errors=True)
+
+
+BACKENDS = {
+    'verilator': VerilatorBackend,
+    'iverilog': IverilogBackend,
+}
+
+
+def select_backend(name=None):
+    """
+    Return the requested backend, or the first available one (Verilator, then iverilog).
+    name defaults to the MATRIX_SIMULATOR environment variable; 'auto' also auto-detects.
+    """
+    name = name or os.environ.get('MATRIX_SIMULATOR', 'auto')
+    if name != 'auto':
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown simulator '{name}', expected one of {', '.join(BACKENDS)}")
+        backend = BACKENDS[name]()
+        if not backend.available():
+            logger.warning(f"⚠️ Simulator {name} requested but not installed")
+        return backend
+
+    for backend_class in BACKENDS.values():
+        backend = backend_class()
+        if backend.available():
+            logger.info(f"🔧 Using {backend.name} simulator backend")
+            return backend
+
+    # Nothing installed: keep the historical default so errors name the missing tool
+    logger.warning("⚠️ Neither Verilator nor iverilog found on PATH")
+    return IverilogBackend()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Sparsity analysis for the matrix accelerator
+Finds all-zero rows, columns and blocks in the operands, so products that must be
+zero can skip the hardware. C = Σk A[:, k]·B[k, :], so a product is zero whenever
+every k has an all-zero column of A or row of B; a tile product is zero whenever
+either of its blocks is.
+"""
+
+import numpy as np
+
+# Block sizes the analysis reports, matching the 4×4 and 8×8 designs
+BLOCK_SIZES = (4, 8)
+
+
+def block_mask(matrix, block):
+    """(rows/block, cols/block) mask of the blocks holding any non-zero entry, edges zero-padded"""
+    rows, cols = matrix.shape
+    padded = np.zeros((-(-rows // block) * block, -(-cols // block) * block), dtype=bool)
+    padded[:rows, :cols] = matrix != 0
+    return padded.reshape(padded.shape[0] // block, block, padded.shape[1] // block, block).any(axis=(1, 3))
+
+
+def analyze(matrix, block_sizes=BLOCK_SIZES):
+    """Density, all-zero rows and columns, and the share of all-zero blocks per block size"""
+    nonzero = matrix != 0
+    return {
+        'density': round(float(nonzero.mean()), 6),
+        'zero_rows': int((~nonzero.any(axis=1)).sum()),
+        'zero_cols': int((~nonzero.any(axis=0)).sum()),
+        'zero_blocks': {f'{block}x{block}': round(1.0 - float(block_mask(matrix, block).mean()), 6)
+                        for block in block_sizes}
+    }
+
+
+def zero_products(a_stack, b_stack):
+    """
+    Bool mask of the (count, n, k) × (count, k, m) products that are zero whatever the
+    arithmetic: no k has both a non-zero column of A and a non-zero row of B
+    """
+    return ~((a_stack != 0).any(axis=-2) & (b_stack != 0).any(axis=-1)).any(axis=-1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Strassen block algorithm for the matrix accelerator
+Each recursion level splits both operands into 2×2 blocks and forms Strassen's seven
+block products instead of eight. The levels are unrolled up front: the operands become
+7^L linear combinations of their blocks, whose products all run as one tiled batch,
+and the results are recombined level by level. Every step is integer-exact.
+"""
+
+import numpy as np
+
+# Coefficients over the blocks [X11, X12, X21, X22] of the seven products
+# M1 = (A11+A22)(B11+B22), M2 = (A21+A22)B11, M3 = A11(B12-B22), M4 = A22(B21-B11),
+# M5 = (A11+A12)B22, M6 = (A21-A11)(B11+B12), M7 = (A12-A22)(B21+B22)
+A_COEFFS = np.array([[1, 0, 0, 1], [0, 0, 1, 1], [1, 0, 0, 0], [0, 0, 0, 1],
+                     [1, 1, 0, 0], [-1, 0, 1, 0], [0, 1, 0, -1]], dtype=np.int64)
+B_COEFFS = np.array([[1, 0, 0, 1], [1, 0, 0, 0], [0, 1, 0, -1], [-1, 0, 1, 0],
+                     [0, 0, 0, 1], [1, 1, 0, 0], [0, 0, 1, 1]], dtype=np.int64)
+# C11 = M1+M4-M5+M7, C12 = M3+M5, C21 = M2+M4, C22 = M1-M2+M3+M6
+C_COEFFS = np.array([[1, 0, 0, 1, -1, 0, 1], [0, 0, 1, 0, 1, 0, 0],
+                     [0, 1, 0, 1, 0, 0, 0], [1, -1, 1, 0, 0, 1, 0]], dtype=np.int64)
+
+ALGORITHMS = ('standard', 'strassen')
+
+# 7^6 leaf products is already far beyond one request's batch
+MAX_LEVELS = 6
+
+
+def strassen_levels(dims, cutoff, tile_size):
+    """
+    Recursion levels for a (rows, inner, cols) product on tile_size tiles: the depth, no
+    deeper than halving down to cutoff, whose 7^L leaves need the fewest tile products
+    once every dimension is padded to a whole number of tiles per leaf
+    """
+    best, best_tiles = 0, None
+    for levels in range(MAX_LEVELS + 1):
+        if levels and min(dims) < cutoff << levels:
+            break
+        step = tile_size << levels
+        tiles = 7 ** levels * int(np.prod([-(-n // step) for n in dims]))
+        if best_tiles is None or tiles < best_tiles:
+            best, best_tiles = levels, tiles
+    return best
+
+
+def _quadrants(stack):
+    """(count, p, q) → (count, 4, p/2, q/2) as [X11, X12, X21, X22]"""
+    count, p, q = stack.shape
+    return stack.reshape(count, 2, p // 2, 2, q // 2).transpose(0, 1, 3, 2, 4).reshape(count, 4, p // 2, q // 2)
+
+
+def split_operands(matrix_a, matrix_b, levels):
+    """
+    Unroll `levels` Strassen levels: returns (7^L, p/2^L, q/2^L) and (7^L, q/2^L, r/2^L)
+    stacks whose pairwise products combine() turns back into A×B. Every dimension
+    must be divisible by 2^L.
+    """
+    a_stack, b_stack = matrix_a[None], matrix_b[None]
+    for _ in range(levels):
+        a_quads, b_quads = _quadrants(a_stack), _quadrants(b_stack)
+        a_stack = np.einsum('mk,nkpq->nmpq', A_COEFFS, a_quads).reshape(-1, *a_quads.shape[2:])
+        b_stack = np.einsum('mk,nkpq->nmpq', B_COEFFS, b_quads).reshape(-1, *b_quads.shape[2:])
+    return a_stack, b_stack
+
+
+def combine(products, levels):
+    """Fold the (7^L, p, r) leaf products of split_operands() back into the (2^L·p, 2^L·r) product"""
+    for _ in range(levels):
+        _, p, r = products.shape
+        blocks = np.einsum('km,nmpr->nkpr', C_COEFFS, products.reshape(-1, 7, p, r))
+        products = blocks.reshape(-1, 2, 2, p, r).transpose(0, 1, 3, 2, 4).reshape(-1, 2 * p, 2 * r)
+    return products[0]
+
+
+def shift_operands(a_stack, b_stack):
+    """
+    Shift each pair by a zero point h (the most negative entry of either operand) so
+    both are non-negative for unsigned designs. Returns (A+h, B+h, h per pair).
+    """
+    lowest = np.minimum(a_stack.min(axis=(1, 2)), b_stack.min(axis=(1, 2)))
+    shift = np.maximum(-lowest, 0)
+    offset = shift[:, None, None]
+    return a_stack + offset, b_stack + offset, shift
+
+
+def unshift_products(products, a_stack, b_stack, shift):
+    """
+    Undo shift_operands on the products of the shifted pairs, exactly:
+    (A+h)(B+h) = AB + h·rowsum(A) + h·colsum(B) + n·h²
+    """
+    h = shift[:, None, None]
+    n = a_stack.shape[-1]
+    return (products - h * a_stack.sum(axis=-1)[:, :, None]
+            - h * b_stack.sum(axis=-2)[:, None, :] - n * h * h)
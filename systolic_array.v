@@ -0,0 +1,138 @@
+// ======================================================================
+// N×N OUTPUT-STATIONARY SYSTOLIC ARRAY (8-bit signed inputs → 16-bit outputs)
+// One pe_mac8 per output element; rows of A flow right, columns of B
+// flow down, each skewed by one cycle per row/column
+//
+// A, B : N×N matrix, flattened, row-major, each element 8 bits
+// C : output N×N matrix, flattened, row-major, each element 16 bits
+//
+// start : pulse for 1 cycle
+// done : goes HIGH when complete, 3N+1 cycles after start
+// ======================================================================
+module systolic_array #(
+    parameter N = 4
+) (
+    input clk,
+    input rst,
+    input start,
+    input [N*N*8-1:0] A,
+    input [N*N*8-1:0] B,
+    output reg [N*N*16-1:0] C,
+    output reg done,
+    output reg busy
+);
+
+    // Operands currently held by each PE, passed on to the right (A) and down (B)
+    reg [N*N*8-1:0] a_pipe;
+    reg [N*N*8-1:0] b_pipe;
+    wire [N*N*16-1:0] psum;
+
+    reg pe_clear;
+    reg pe_valid;
+    reg [15:0] step;
+
+    genvar gi, gj;
+    generate
+        for (gi = 0; gi < N; gi = gi + 1) begin : GEN_ROW
+            for (gj = 0; gj < N; gj = gj + 1) begin : GEN_COL
+                pe_mac8 pe (
+                    .clk(clk),
+                    .clear(pe_clear),
+                    .valid(pe_valid),
+                    .a(a_pipe[(gi*N + gj)*8 +: 8]),
+                    .b(b_pipe[(gi*N + gj)*8 +: 8]),
+                    .c(psum[(gi*N + gj)*16 +: 16])
+                );
+            end
+        end
+    endgenerate
+
+    // States
+    localparam IDLE  = 2'd0;
+    localparam FEED  = 2'd1;
+    localparam STORE = 2'd2;
+    localparam DONE  = 2'd3;
+
+    reg [1:0] state;
+    integer r, q;
+
+    // ==========================================================
+    // SKEWED OPERAND FEED
+    // At step t row r receives A[r][t-r] and column q receives
+    // B[t-q][q], so PE (r,q) sees A[r][k] and B[k][q] together
+    // ==========================================================
+    always @(posedge clk) begin
+        if (rst || state != FEED) begin
+            a_pipe <= 0;
+            b_pipe <= 0;
+        end else begin
+            for (r = 0; r < N; r = r + 1) begin
+                for (q = 0; q < N; q = q + 1) begin
+                    if (q == 0)
+                        a_pipe[(r*N)*8 +: 8] <= (step >= r && step < r + N) ? A[(r*N + step - r)*8 +: 8] : 8'd0;
+                    else
+                        a_pipe[(r*N + q)*8 +: 8] <= a_pipe[(r*N + q - 1)*8 +: 8];
+
+                    if (r == 0)
+                        b_pipe[q*8 +: 8] <= (step >= q && step < q + N) ? B[((step - q)*N + q)*8 +: 8] : 8'd0;
+                    else
+                        b_pipe[(r*N + q)*8 +: 8] <= b_pipe[((r - 1)*N + q)*8 +: 8];
+                end
+            end
+        end
+    end
+
+    // ==========================================================
+    // CONTROL
+    // ==========================================================
+    always @(posedge clk or posedge rst) begin
+        if (rst) begin
+            C <= 0;
+            done <= 1'b0;
+            busy <= 1'b0;
+            pe_clear <= 1'b0;
+            pe_valid <= 1'b0;
+            step <= 16'd0;
+            state <= IDLE;
+        end else begin
+            case (state)
+                IDLE: begin
+                    done <= 1'b0;
+                    if (start) begin
+                        busy <= 1'b1;
+                        pe_clear <= 1'b1;
+                        step <= 16'd0;
+                        state <= FEED;
+                    end
+                end
+
+                FEED: begin
+                    // The last operands enter at step 3N-3 and are accumulated one step later
+                    pe_clear <= 1'b0;
+                    pe_valid <= (step < 3*N - 2);
+                    step <= step + 16'd1;
+                    if (step == 3*N - 2)
+                        state <= STORE;
+                end
+
+                STORE: begin
+                    C <= psum;
+                    state <= DONE;
+                end
+
+                DONE: begin
+                    done <= 1'b1;
+                    busy <= 1'b0;
+                    if (!start) begin
+                        state <= IDLE;
+                    end
+                end
+
+                default: begin
+                    state <= IDLE;
+                end
+            endcase
+        end
+    end
+
+endmodule
@@ -0,0 +1,33 @@
+"""
+Shared fixtures. The app modules live flat in the repository root, and no simulator is
+needed: the `accelerator` fixture replaces compilation and simulation with a fake that
+prints the RESULT lines a real testbench would.
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def fake_simulation(binary, operands, design):
+    """Multiply the encoded operands as the design would and print its packed result lines"""
+    a_stack, b_stack = operands
+    raw = np.matmul(a_stack, b_stack) & 0xFFFFFFFF
+    lines = [f"RESULT {design['latency_cycles']} " + ''.join(f'{int(v):08x}' for v in product.ravel())
+             for product in raw]
+    return subprocess.CompletedProcess([binary], 0, '\n'.join(lines) + '\n', '')
+
+
+@pytest.fixture
+def accelerator(monkeypatch):
+    from app_enhanced import EnhancedVerilogAccelerator
+    accelerator = EnhancedVerilogAccelerator(resident_workers=0)
+    monkeypatch.setattr(accelerator, 'get_compiled_design', lambda design, source_hash=None: ('fake', None))
+    monkeypatch.setattr(accelerator, 'run_simulation', fake_simulation)
+    yield accelerator
+    accelerator.shutdown(wait=True)
@@ -0,0 +1,106 @@
+"""Accelerator paths end to end, on the fake simulator from conftest"""
+
+import numpy as np
+import pytest
+
+import app_enhanced
+from app_enhanced import run_request, tiled_request
+from numeric_modes import get_mode, mode_product
+
+
+def test_batch_of_mixed_sizes_matches_numpy(accelerator):
+    rng = np.random.default_rng(0)
+    pairs = [(rng.integers(0, 100, (n, n)), rng.integers(0, 100, (n, n))) for n in (2, 4, 8, 4, 3)]
+    results, groups, error = accelerator.multiply_batch(pairs, use_cache=False)
+    assert error is None
+    for (a, b), result in zip(pairs, results):
+        assert np.array_equal(result, a @ b)
+    assert {group['size'] for group in groups} == {'2x2', '3x3', '4x4', '8x8'}
+
+
+def test_wrapping_mode_matches_the_mode_product(accelerator):
+    rng = np.random.default_rng(1)
+    mode = get_mode('int8')
+    pairs = [(rng.integers(-128, 128, (4, 4)), rng.integers(-128, 128, (4, 4))) for _ in range(10)]
+    results, _, error = accelerator.multiply_batch(pairs, use_cache=False, numeric_mode='int8')
+    assert error is None
+    for (a, b), result in zip(pairs, results):
+        assert np.array_equal(result, mode_product(a, b, mode))
+
+
+def test_batch_larger_than_the_scheduler_queue_runs_in_a_bounded_window(accelerator, monkeypatch):
+    monkeypatch.setattr(app_enhanced, 'MAX_BATCH_JOBS', 2)
+    rng = np.random.default_rng(2)
+    pairs = [(rng.integers(1, 9, (2, 2)), rng.integers(1, 9, (2, 2))) for _ in range(4 * accelerator.scheduler.max_queue)]
+    results, groups, error = accelerator.multiply_batch(pairs, use_cache=False)
+    assert error is None
+    assert groups[0]['simulations'] == len(pairs) // 2
+    assert accelerator.scheduler.stats()['rejected'] == 0
+    assert all(np.array_equal(result, a @ b) for (a, b), result in zip(pairs, results))
+
+
+def test_failed_chunk_fails_the_batch(accelerator, monkeypatch):
+    import subprocess
+    monkeypatch.setattr(accelerator, 'run_simulation',
+                        lambda binary, operands, design: subprocess.CompletedProcess([binary], 1, '', 'boom'))
+    results, _, error = accelerator.multiply_batch([(np.ones((2, 2)), np.ones((2, 2)))], use_cache=False)
+    assert results is None and 'boom' in error
+
+
+def test_cached_pairs_skip_the_simulator(accelerator):
+    pairs = [(np.full((4, 4), 3), np.full((4, 4), 5))]
+    accelerator.multiply_batch(pairs)
+    _, groups, _ = accelerator.multiply_batch(pairs)
+    assert groups[0]['cache_hits'] == 1 and groups[0]['simulations'] == 0
+
+
+@pytest.mark.parametrize('algorithm', ['standard', 'strassen'])
+@pytest.mark.parametrize('shape', [(16, 16, 16), (13, 7, 21), (32, 32, 32)])
+def test_tiled_products_are_exact(accelerator, algorithm, shape):
+    rows, inner, cols = shape
+    rng = np.random.default_rng(rows)
+    a = rng.integers(-200, 200, (rows, inner))
+    b = rng.integers(-200, 200, (inner, cols))
+    result, summary, error = accelerator.multiply_tiled(a, b, tile_size=4, use_cache=False, algorithm=algorithm)
+    assert error is None
+    assert np.array_equal(result, a @ b)
+    assert summary['algorithm'] == algorithm
+
+
+def test_strassen_saves_tile_products(accelerator):
+    rng = np.random.default_rng(4)
+    a, b = rng.integers(0, 50, (32, 32)), rng.integers(0, 50, (32, 32))
+    _, summary, _ = accelerator.multiply_tiled(a, b, tile_size=4, use_cache=False, algorithm='strassen')
+    assert summary['strassen']['levels'] == 3
+    assert summary['strassen']['tile_products'] == 343
+    assert summary['strassen']['standard_tile_products'] == 512
+
+
+def test_zero_blocks_are_skipped(accelerator):
+    a = np.zeros((16, 16), dtype=np.int64)
+    a[:4, :4] = 7
+    b = np.ones((16, 16), dtype=np.int64)
+    result, summary, _ = accelerator.multiply_tiled(a, b, tile_size=4, use_cache=False)
+    assert np.array_equal(result, a @ b)
+    assert summary['sparsity']['skipped_tile_products'] == 64 - 4
+
+
+@pytest.mark.parametrize('tile_size', ['abc', 0, 1, 9, 2.5, True, [4]])
+def test_invalid_tile_size_is_a_400(accelerator, monkeypatch, tile_size):
+    monkeypatch.setattr(app_enhanced, 'accelerator', accelerator)
+    data = {'matrixA': [[1, 2], [3, 4]], 'matrixB': [[1, 2], [3, 4]], 'tileSize': tile_size}
+    response, status, _ = run_request(tiled_request, data, 'tiled')
+    assert status == 400 and 'tileSize' in response['error']
+
+
+def test_tiled_request_with_strassen_comparison(accelerator, monkeypatch):
+    monkeypatch.setattr(app_enhanced, 'accelerator', accelerator)
+    rng = np.random.default_rng(6)
+    a, b = rng.integers(-9, 9, (16, 16)), rng.integers(-9, 9, (16, 16))
+    data = {'matrixA': a, 'matrixB': b, 'tileSize': 4, 'algorithm': 'strassen', 'compareStandard': True}
+    response, status, _ = run_request(tiled_request, data, 'tiled')
+    assert status == 200
+    assert np.array_equal(response['result'], a @ b)
+    assert response['verification']['results_match']
+    assert response['comparison']['results_equal']
+    assert response['comparison']['strassen']['tile_products'] < response['comparison']['standard']['tile_products']
@@ -0,0 +1,68 @@
+import itertools
+
+import numpy as np
+
+from chain import (ChainCostModel, describe_order, left_to_right, operand_key, order_cost, plan_chain,
+                   product_key, stage_sequence)
+
+
+def macs(p, q, r):
+    return p * q * r
+
+
+def all_orders(i, j):
+    if i == j:
+        yield i
+        return
+    for k in range(i, j):
+        for left, right in itertools.product(all_orders(i, k), all_orders(k + 1, j)):
+            yield left, right
+
+
+def test_plan_matches_brute_force():
+    dims = [30, 35, 15, 5, 10, 20, 25]
+    cost, order = plan_chain(dims, macs)
+    assert cost == 15125
+    assert cost == min(order_cost(o, dims, macs)[0] for o in all_orders(0, len(dims) - 2))
+    assert order_cost(order, dims, macs)[0] == cost
+    assert describe_order(order) == '((A0×(A1×A2))×((A3×A4)×A5))'
+
+
+def test_identical_halves_are_paid_for_once():
+    dims = [8, 8, 8, 8, 8]
+    keys = ['a', 'b', 'a', 'b']
+    cost, order = plan_chain(dims, macs, keys)
+    assert order == ((0, 1), (2, 3))
+    assert cost == 2 * 8 ** 3
+
+
+def test_left_to_right_and_stage_sequence():
+    order = left_to_right(4)
+    assert order == (((0, 1), 2), 3)
+    assert stage_sequence(order, 4) == [(0, 1), (4, 2), (5, 3)]
+    assert stage_sequence(((0, 1), (2, 3)), 4) == [(0, 1), (2, 3), (4, 5)]
+
+
+def test_keys_depend_on_content_and_shape():
+    a = np.arange(6).reshape(2, 3)
+    assert operand_key(a) == operand_key(a.copy())
+    assert operand_key(a) != operand_key(a.reshape(3, 2))
+    assert product_key('x', 'y') != product_key('y', 'x')
+
+
+def test_design_costs_are_calibrated_once_and_follow_observations():
+    calls = []
+
+    def calibrate(jobs):
+        calls.append(jobs)
+        return 0.010 + jobs * 0.001
+
+    model = ChainCostModel(jobs_per_simulation=4)
+    design = {'key': 'fake', 'size': 4}
+    first = model.design_cost(8, 8, 8, design, calibrate)
+    assert model.design_cost(8, 8, 8, design, calibrate) == first
+    assert len(calls) == 3
+    # 8 tile jobs in 2 simulations
+    assert abs(first - (2 * 0.010 + 8 * 0.001)) < 1e-9
+    model.observe_design('fake', jobs=8, simulations=2, seconds=1.0)
+    assert model.design_cost(8, 8, 8, design, calibrate) > first
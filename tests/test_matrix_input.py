@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from matrix_input import MatrixInputError, check_product, from_sparse, to_matrices, to_matrix
+
+
+def test_to_matrix_accepts_whole_floats_and_rejects_the_rest():
+    assert to_matrix([[1.0, 2.0], [3.0, 4.0]]).dtype == np.int64
+    for bad in ([[1.5, 2]], [[1, 2], [3]], [['a', 'b']], [], [[True, False]]):
+        with pytest.raises(MatrixInputError):
+            to_matrix(bad)
+
+
+def test_to_matrix_rejects_values_beyond_int64():
+    with pytest.raises(MatrixInputError):
+        to_matrix([[1 << 63, 0]])
+
+
+def test_to_matrices_needs_equal_shapes():
+    assert to_matrices([[[1, 2], [3, 4]], [[5, 6], [7, 8]]]).shape == (2, 2, 2)
+    with pytest.raises(MatrixInputError):
+        to_matrices([[[1, 2], [3, 4]], [[5, 6]]])
+
+
+def test_csr_expands_to_dense():
+    dense = np.array([[0, 5, 0], [0, 0, 0], [7, 0, 9]])
+    csr = {'format': 'csr', 'shape': [3, 3], 'data': [5, 7, 9], 'indices': [1, 0, 2], 'indptr': [0, 1, 1, 3]}
+    assert np.array_equal(to_matrix(csr), dense)
+
+
+def test_coo_sums_duplicate_entries():
+    coo = {'format': 'COO', 'shape': [2, 2], 'row': [0, 0, 1], 'col': [1, 1, 0], 'data': [2, 3, 4]}
+    assert to_matrix(coo).tolist() == [[0, 5], [4, 0]]
+
+
+@pytest.mark.parametrize('bad', [
+    {'format': 'dia', 'shape': [2, 2]},
+    {'format': 'coo', 'shape': [2, 0], 'row': [], 'col': [], 'data': []},
+    {'format': 'coo', 'shape': [2, 2], 'row': [2], 'col': [0], 'data': [1]},
+    {'format': 'coo', 'shape': [2, 2], 'row': [0, 1], 'col': [0], 'data': [1]},
+    {'format': 'coo', 'shape': [2, 2], 'row': [0], 'col': [0], 'data': [1.5]},
+    {'format': 'csr', 'shape': [2, 2], 'data': [1], 'indices': [0], 'indptr': [0, 2, 1]},
+    {'format': 'csr', 'shape': [1 << 12, 1 << 12], 'data': [], 'indices': [], 'indptr': [0]},
+])
+def test_malformed_sparse_objects_are_input_errors(bad):
+    with pytest.raises(MatrixInputError):
+        from_sparse(bad)
+
+
+def test_check_product_refuses_sums_that_overflow_int64():
+    big = np.full((2, 2), 1 << 31, dtype=np.int64)
+    check_product(big, big - 1)
+    with pytest.raises(MatrixInputError):
+        check_product(big * 2, big * 2)
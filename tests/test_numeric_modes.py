@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from designs import DESIGN_REGISTRY
+from matrix_input import MatrixInputError
+from numeric_modes import (NUMERIC_MODES, check_operands, decode_results, encode_operands, get_mode,
+                           mode_product, wrap)
+
+
+def test_get_mode_defaults_to_exact_int64():
+    assert get_mode()['name'] == 'int64'
+    with pytest.raises(MatrixInputError):
+        get_mode('int4')
+
+
+def test_wrap_is_twos_complement():
+    values = np.array([127, 128, 255, 256, -129], dtype=np.int64)
+    assert wrap(values, 8).tolist() == [127, -128, -1, 0, 127]
+    assert wrap(values, None) is values
+
+
+@pytest.mark.parametrize('name', [name for name in NUMERIC_MODES if name != 'int64'])
+def test_mode_product_wraps_like_the_accumulator(name):
+    mode = get_mode(name)
+    rng = np.random.default_rng(0)
+    high = 1 << (mode['input_bits'] - 1)
+    a = rng.integers(-high, high, (3, 4, 4))
+    b = rng.integers(-high, high, (3, 4, 4))
+    # Exact products as Python ints, wrapped to the accumulator width by hand
+    exact = np.matmul(a.astype(object), b.astype(object))
+    half, full = 1 << (mode['acc_bits'] - 1), 1 << mode['acc_bits']
+    expected = np.vectorize(lambda v: (v + half) % full - half)(exact).astype(np.int64)
+    assert np.array_equal(mode_product(a, b, mode), expected)
+
+
+def test_check_operands_enforces_the_input_width():
+    mode = get_mode('int8')
+    check_operands(np.full((2, 2), 127), np.full((2, 2), -128), mode)
+    with pytest.raises(MatrixInputError):
+        check_operands(np.full((2, 2), 128), np.ones((2, 2), dtype=np.int64), mode)
+
+
+def test_encode_decode_round_trip_on_unsigned_design():
+    """Signed int16 operands survive the zero-point shift onto an unsigned 16-bit design"""
+    design, mode = DESIGN_REGISTRY['matrix_mult_4x4'], get_mode('int16')
+    rng = np.random.default_rng(1)
+    a = rng.integers(-1 << 15, 1 << 15, (5, 4, 4))
+    b = rng.integers(-1 << 15, 1 << 15, (5, 4, 4))
+    enc_a, enc_b = encode_operands(a, b, design, mode)
+    assert enc_a.min() >= 0 and enc_b.min() >= 0
+    raw = np.matmul(enc_a, enc_b) & 0xFFFFFFFF
+    assert np.array_equal(decode_results(raw, a, b, design, mode), mode_product(a, b, mode))
@@ -0,0 +1,38 @@
+import numpy as np
+
+import result_cache
+from result_cache import ResultCache
+
+
+def test_keys_cover_kind_design_shape_and_content():
+    a = np.arange(4).reshape(2, 2)
+    key = ResultCache.make_key('single', 'd', a, a)
+    assert key == ResultCache.make_key('single', 'd', a.tolist(), a.copy())
+    assert key != ResultCache.make_key('batch', 'd', a, a)
+    assert key != ResultCache.make_key('single', 'e', a, a)
+    assert key != ResultCache.make_key('single', 'd', a.reshape(1, 4), a.reshape(4, 1))
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, 'monotonic', lambda: now[0])
+    cache = ResultCache(ttl=10)
+    cache.put('a', 1)
+    now[0] += 9
+    assert cache.get('a') == 1
+    now[0] += 2
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert stats['expirations'] == 1 and stats['entries'] == 0
+    assert stats['hits'] == 1 and stats['misses'] == 1
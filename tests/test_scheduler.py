@@ -0,0 +1,97 @@
+import threading
+import time
+from contextlib import closing
+
+import pytest
+
+from scheduler import SchedulerFullError, SimulationScheduler
+
+
+@pytest.fixture
+def gate():
+    """Event jobs block on; always released so the scheduler can shut down"""
+    gate = threading.Event()
+    yield gate
+    gate.set()
+
+
+@pytest.fixture
+def scheduler(gate):
+    scheduler = SimulationScheduler(num_workers=1, max_queue=4)
+    yield scheduler
+    gate.set()
+    scheduler.shutdown()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_submit_rejects_when_the_queue_is_full(scheduler, gate):
+    running = scheduler.submit(gate.wait)
+    wait_until(lambda: scheduler.stats()['active_jobs'] == 1)
+    queued = [scheduler.submit(gate.wait) for _ in range(4)]
+    with pytest.raises(SchedulerFullError):
+        scheduler.submit(gate.wait)
+    gate.set()
+    assert all(scheduler.result(future)[0] for future in [running] + queued)
+
+
+def test_run_bounded_runs_more_jobs_than_the_queue_holds(scheduler):
+    results = [result for result, _ in scheduler.run_bounded((pow, i, 2) for i in range(50))]
+    assert results == [i * i for i in range(50)]
+    assert scheduler.stats()['rejected'] == 0
+
+
+def test_run_bounded_cancels_jobs_not_yet_started(scheduler):
+    ran = []
+
+    def job(i):
+        time.sleep(0.01)
+        ran.append(i)
+        return i
+
+    with closing(scheduler.run_bounded((job, i) for i in range(20))) as results:
+        for result, _ in results:
+            if result == 1:
+                break
+    scheduler.shutdown()
+    assert len(ran) <= 2 + scheduler.window
+
+
+def test_run_bounded_is_refused_only_before_it_is_admitted(scheduler, gate):
+    scheduler.submit(gate.wait)
+    wait_until(lambda: scheduler.stats()['active_jobs'] == 1)
+    blockers = [scheduler.submit(gate.wait) for _ in range(4)]
+    with pytest.raises(SchedulerFullError):
+        next(scheduler.run_bounded((gate.wait,) for _ in range(3)))
+    gate.set()
+    for future in blockers:
+        scheduler.result(future)
+
+
+def test_run_bounded_waits_for_room_once_admitted(scheduler, gate):
+    outcome = {}
+
+    def consume():
+        try:
+            outcome['results'] = [result for result, _ in scheduler.run_bounded((gate.wait,) for _ in range(6))]
+        except Exception as e:
+            outcome['error'] = e
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    # Its first jobs are in; now another caller fills the rest of the queue
+    wait_until(lambda: scheduler.stats()['submitted'] == scheduler.window)
+    others = []
+    while len(others) < scheduler.max_queue:
+        try:
+            others.append(scheduler.submit(gate.wait))
+        except SchedulerFullError:
+            break
+    gate.set()
+    consumer.join(10)
+    assert outcome == {'results': [True] * 6}
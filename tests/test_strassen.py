@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from strassen import combine, shift_operands, split_operands, strassen_levels, unshift_products
+
+
+@pytest.mark.parametrize('levels', [0, 1, 2, 3])
+def test_split_then_combine_is_the_exact_product(levels):
+    rng = np.random.default_rng(levels)
+    a = rng.integers(-1000, 1000, (16, 24))
+    b = rng.integers(-1000, 1000, (24, 8))
+    a_leaves, b_leaves = split_operands(a, b, levels)
+    assert len(a_leaves) == 7 ** levels
+    assert np.array_equal(combine(np.matmul(a_leaves, b_leaves), levels), a @ b)
+
+
+def test_shift_makes_operands_non_negative_and_unshift_is_exact():
+    rng = np.random.default_rng(7)
+    a = rng.integers(-50, 50, (6, 4, 4))
+    b = rng.integers(-50, 50, (6, 4, 4))
+    a[0] = np.abs(a[0])
+    b[0] = np.abs(b[0])
+    a_shift, b_shift, shift = shift_operands(a, b)
+    assert a_shift.min() >= 0 and b_shift.min() >= 0
+    assert shift[0] == 0
+    products = unshift_products(np.matmul(a_shift, b_shift), a, b, shift)
+    assert np.array_equal(products, np.matmul(a, b))
+
+
+def test_levels_stop_at_the_cutoff_and_avoid_wasteful_padding():
+    assert strassen_levels((64, 64, 64), 4, 4) == 4
+    assert strassen_levels((64, 64, 64), 16, 4) == 2
+    assert strassen_levels((7, 7, 7), 4, 4) == 0
+    # Padding 20 up to 32 for two levels would cost more tile products than plain tiling
+    assert strassen_levels((30, 20, 45), 4, 4) == 0
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from matrix_input import MatrixInputError
+from numeric_modes import get_mode, mode_product
+from verification import MAX_ROUNDS, check_chain, confidence, find_mismatches, get_verification
+
+
+@pytest.fixture
+def products():
+    rng = np.random.default_rng(3)
+    a = rng.integers(-100, 100, (20, 6, 6))
+    b = rng.integers(-100, 100, (20, 6, 6))
+    c = np.matmul(a, b)
+    # Product 4 is wrong in every entry, product 11 in a single one
+    c[4] += 1
+    c[11, 2, 3] += 1
+    return a, b, c
+
+
+def test_policies_and_their_input_errors():
+    assert get_verification() == {'mode': 'full'}
+    assert get_verification('freivalds', rounds='5')['rounds'] == 5
+    for bad in (('nope',), ('freivalds', 0), ('freivalds', MAX_ROUNDS + 1), ('sampled', None, 'x')):
+        with pytest.raises(MatrixInputError):
+            get_verification(*bad)
+
+
+def test_confidence_bounds():
+    assert confidence({'mode': 'full'}, 64) == 1.0
+    assert confidence({'mode': 'off'}, 64) == 0.0
+    assert confidence({'mode': 'freivalds', 'rounds': 10}, 64) == 1 - 2 ** -10
+    assert confidence({'mode': 'sampled', 'samples': 16}, 64) == 0.25
+
+
+def test_full_and_freivalds_find_every_wrong_product(products):
+    a, b, c = products
+    mode = get_mode('int64')
+    wrong, expected = find_mismatches(a, b, c, mode, get_verification('full'))
+    assert wrong.tolist() == [4, 11] and np.array_equal(expected, np.matmul(a, b))
+    rng = np.random.default_rng(0)
+    wrong, expected = find_mismatches(a, b, c, mode, get_verification('freivalds', rounds=40), rng)
+    assert wrong.tolist() == [4, 11] and expected is None
+
+
+def test_sampled_and_off(products):
+    a, b, c = products
+    mode = get_mode('int64')
+    wrong, _ = find_mismatches(a, b, c, mode, get_verification('sampled', samples=36))
+    assert wrong.tolist() == [4, 11]
+    wrong, expected = find_mismatches(a, b, c, mode, get_verification('off'))
+    assert not len(wrong) and expected is None
+
+
+def test_freivalds_respects_wrapping_modes():
+    mode = get_mode('int8')
+    rng = np.random.default_rng(5)
+    a = rng.integers(-128, 128, (10, 8, 8))
+    b = rng.integers(-128, 128, (10, 8, 8))
+    wrong, _ = find_mismatches(a, b, mode_product(a, b, mode), mode, get_verification('freivalds'), rng)
+    assert not len(wrong)
+
+
+@pytest.mark.parametrize('policy', ['full', 'freivalds', 'sampled'])
+def test_check_chain(policy):
+    rng = np.random.default_rng(9)
+    matrices = [rng.integers(-9, 9, shape) for shape in ((4, 6), (6, 3), (3, 5))]
+    product = matrices[0] @ matrices[1] @ matrices[2]
+    mode = get_mode('int64')
+    verification = get_verification(policy, rounds=30, samples=20)
+    assert check_chain(matrices, product, mode, verification, rng)
+    product[0, 0] += 1
+    assert not check_chain(matrices, product, mode, verification, rng)
+    assert check_chain(matrices, product, mode, get_verification('off')) is None
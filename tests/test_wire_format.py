@@ -0,0 +1,52 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from matrix_input import MatrixInputError
+from wire_format import MAGIC, decode, encode
+
+
+def test_round_trip_keeps_arrays_dtypes_and_plain_values():
+    a = np.arange(16, dtype=np.int64).reshape(4, 4)
+    payload = {'matrixA': a, 'pairs': [{'matrixB': a.T}], 'scale': np.int64(3), 'name': 'x', 'none': None}
+    decoded = decode(encode(payload))
+    assert np.array_equal(decoded['matrixA'], a) and decoded['matrixA'].dtype == np.int64
+    assert np.array_equal(decoded['pairs'][0]['matrixB'], a.T)
+    assert decoded['scale'] == 3 and decoded['name'] == 'x' and decoded['none'] is None
+
+
+def test_lists_of_same_shape_arrays_travel_as_one_record_and_come_back_as_a_list():
+    stack = [np.full((2, 2), i, dtype=np.int32) for i in range(5)]
+    body = encode({'results': stack, 'again': stack[0]})
+    envelope = json.loads(body[8:8 + struct.unpack_from('<I', body, 4)[0]])
+    assert envelope['results'] == {'$array': 0, 'split': True}
+    decoded = decode(body)
+    assert [m.tolist() for m in decoded['results']] == [m.tolist() for m in stack]
+
+
+def test_decoded_arrays_are_aligned_read_only_views():
+    body = encode({'m': np.ones((8, 8), dtype=np.int64)})
+    array = decode(body)['m']
+    assert not array.flags.writeable
+    assert array.ctypes.data % 8 == 0
+
+
+@pytest.mark.parametrize('body', [
+    b'JSON{}',
+    MAGIC + struct.pack('<I', 3) + b'{x}',
+    MAGIC + struct.pack('<I', 13) + b'{"$array": 0}',
+])
+def test_malformed_bodies_are_input_errors(body):
+    with pytest.raises(MatrixInputError):
+        decode(body)
+
+
+def test_truncated_and_object_records_are_refused():
+    body = encode({'m': np.ones((8, 8), dtype=np.int64)})
+    with pytest.raises(MatrixInputError):
+        decode(body[:-8])
+    pickled = encode({'m': np.array([None, 1], dtype=object)})
+    with pytest.raises(MatrixInputError):
+        decode(pickled)
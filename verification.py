@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Result verification policies for the matrix accelerator
+A request can recompute every product with NumPy ('full'), skip checking ('off'),
+recompute a random sample of result entries ('sampled'), or run Freivalds' randomized
+check ('freivalds'): C·r = A·(B·r) for random 0/1 vectors r, O(n²) per round instead
+of the O(n³) product. A wrong product passes one round with probability at most 1/2.
+"""
+
+import numpy as np
+
+from matrix_input import MatrixInputError
+from numeric_modes import wrap, mode_product
+
+VERIFICATION_MODES = {
+    'full': 'every product recomputed with NumPy',
+    'off': 'no verification',
+    'sampled': 'a random sample of result entries recomputed',
+    'freivalds': "Freivalds' randomized check, O(n²) per round",
+}
+
+# Requests that do not name a policy get full verification, as before policies existed
+DEFAULT_VERIFICATION = 'full'
+DEFAULT_ROUNDS = 10
+MAX_ROUNDS = 64
+# Entries recomputed per product by 'sampled'
+DEFAULT_SAMPLES = 16
+
+
+def get_verification(name=None, rounds=None, samples=None):
+    """Policy dict for a request's verification fields; unknown names and bad counts are an input error"""
+    name = name or DEFAULT_VERIFICATION
+    if name not in VERIFICATION_MODES:
+        raise MatrixInputError(f"Unknown verification '{name}', expected one of {', '.join(VERIFICATION_MODES)}")
+    policy = {'mode': name}
+    if name == 'freivalds':
+        policy['rounds'] = _count(rounds, DEFAULT_ROUNDS, 'verificationRounds', MAX_ROUNDS)
+    elif name == 'sampled':
+        policy['samples'] = _count(samples, DEFAULT_SAMPLES, 'verificationSamples')
+    return policy
+
+
+def _count(value, default, name, limit=None):
+    if value is None:
+        return default
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise MatrixInputError(f"{name} must be an integer")
+    if count < 1 or (limit is not None and count > limit):
+        raise MatrixInputError(f"{name} must be between 1 and {limit}" if limit else f"{name} must be at least 1")
+    return count
+
+
+def confidence(policy, entries):
+    """
+    Lower bound on the chance that a wrong product of `entries` result entries is caught.
+    For 'sampled' this is the case of a single wrong entry, the hardest to find.
+    """
+    mode = policy['mode']
+    if mode == 'full':
+        return 1.0
+    if mode == 'off':
+        return 0.0
+    if mode == 'freivalds':
+        return 1.0 - 0.5 ** policy['rounds']
+    return min(1.0, policy['samples'] / entries)
+
+
+def find_mismatches(matrix_a, matrix_b, products, mode, policy, rng=None):
+    """
+    Check (count, n, k) × (count, k, m) products under a policy and numeric mode.
+    Returns (indices of products found wrong, reference products or None). The
+    reference is only computed by 'full', which callers can then report directly.
+    """
+    policy_mode = policy['mode']
+    if policy_mode == 'off':
+        return np.empty(0, dtype=np.int64), None
+    if policy_mode == 'full':
+        expected = mode_product(matrix_a, matrix_b, mode)
+        return np.flatnonzero((products != expected).any(axis=(-2, -1))), expected
+
+    rng = rng or np.random.default_rng()
+    bits = mode['acc_bits']
+    if policy_mode == 'freivalds':
+        # All rounds at once: one (m, rounds) block of 0/1 columns per product. int64
+        # arithmetic wraps mod 2^64, and the products are only defined mod 2^bits in the
+        # wrapping modes, so both sides are compared after the accumulator's wrap
+        count, _, cols = products.shape
+        r = rng.integers(0, 2, (count, cols, policy['rounds']), dtype=np.int64)
+        left = wrap(np.matmul(products, r), bits)
+        right = wrap(np.matmul(matrix_a, np.matmul(matrix_b, r)), bits)
+        return np.flatnonzero((left != right).any(axis=(-2, -1))), None
+
+    # 'sampled': recompute the same random entries of every product as row·column dots
+    count, rows, cols = products.shape
+    samples = min(policy['samples'], rows * cols)
+    flat = rng.choice(rows * cols, samples, replace=False)
+    i, j = flat // cols, flat % cols
+    expected = wrap(np.einsum('psk,pks->ps', matrix_a[:, i, :], matrix_b[:, :, j]), bits)
+    return np.flatnonzero((products[:, i, j] != expected).any(axis=-1)), None
+
+
+def describe(policy, entries):
+    """Response fields for a policy applied to products of `entries` result entries"""
+    return dict(policy, confidence=round(confidence(policy, entries), 6))
+
+
+def check_chain(matrices, product, mode, policy, rng=None):
+    """
+    Check a chain product A0×A1×…×An under a policy without trusting any intermediate:
+    'full' recomputes the chain, 'freivalds' compares product·r with A0·(A1·(…(An·r)))
+    and 'sampled' pushes the sampled rows of A0 through the chain. Returns whether the
+    product passed, or None for 'off'.
+    """
+    policy_mode = policy['mode']
+    if policy_mode == 'off':
+        return None
+    bits = mode['acc_bits']
+    if policy_mode == 'full':
+        expected = matrices[0]
+        for matrix in matrices[1:]:
+            expected = mode_product(expected, matrix, mode)
+        return bool(np.array_equal(product, expected))
+
+    rng = rng or np.random.default_rng()
+    rows, cols = product.shape
+    if policy_mode == 'freivalds':
+        # int64 arithmetic wraps mod 2^64, which the accumulator's wrap divides
+        r = rng.integers(0, 2, (cols, policy['rounds']), dtype=np.int64)
+        right = r
+        for matrix in reversed(matrices):
+            right = np.matmul(matrix, right)
+        return bool(np.array_equal(wrap(np.matmul(product, r), bits), wrap(right, bits)))
+
+    samples = min(policy['samples'], rows * cols)
+    flat = rng.choice(rows * cols, samples, replace=False)
+    i, j = flat // cols, flat % cols
+    partial = matrices[0][i]
+    for matrix in matrices[1:]:
+        partial = np.matmul(partial, matrix)
+    return bool(np.array_equal(product[i, j], wrap(partial[np.arange(samples), j], bits)))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Binary wire format for the matrix accelerator
+A request or response body is a small JSON envelope followed by standard .npy records.
+Arrays in the envelope are replaced by {"$array": i} placeholders; a list of same-shape
+arrays travels as one stacked record marked "split". Records start 64-byte aligned, so
+decoded arrays are read-only views straight into the body, without copying.
+
+    MXF1 | u32le envelope length | envelope JSON | pad | .npy record | pad | .npy record ...
+"""
+
+import io
+import json
+import struct
+
+import numpy as np
+
+from matrix_input import MatrixInputError
+
+MEDIA_TYPE = 'application/x-matrix-frames'
+MAGIC = b'MXF1'
+
+# .npy headers pad their data to 64 bytes, so aligned records give aligned data
+ALIGN = 64
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def encode(payload):
+    """Serialize a dict whose values may be (lists of) NumPy arrays. Returns bytes."""
+    arrays = []
+    seen = {}
+
+    def placeholder(array):
+        # The same array object appearing twice (e.g. result and numpy_result) is sent once
+        if id(array) not in seen:
+            seen[id(array)] = len(arrays)
+            arrays.append(array)
+        return {'$array': seen[id(array)]}
+
+    def walk(value):
+        if isinstance(value, np.ndarray):
+            return placeholder(value)
+        if isinstance(value, dict):
+            return {key: walk(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            if value and all(isinstance(item, np.ndarray) for item in value) \
+                    and len({(item.shape, item.dtype) for item in value}) == 1:
+                return dict(placeholder(np.stack(value)), split=True)
+            return [walk(item) for item in value]
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    envelope = json.dumps(walk(payload)).encode()
+    parts = [MAGIC, struct.pack('<I', len(envelope)), envelope]
+    offset = len(MAGIC) + 4 + len(envelope)
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, np.lib.format.header_data_from_array_1_0(array))
+        padding = _aligned(offset) - offset
+        parts += [b'\0' * padding, header.getvalue(), array.tobytes()]
+        offset += padding + header.tell() + array.nbytes
+    return b''.join(parts)
+
+
+def decode(body):
+    """
+    Parse a body produced by encode(). Arrays come back as read-only views of body;
+    object arrays are refused, so decoding never unpickles anything.
+    """
+    if body[:len(MAGIC)] != MAGIC or len(body) < len(MAGIC) + 4:
+        raise MatrixInputError(f"Body is not {MEDIA_TYPE} data")
+    (length,) = struct.unpack_from('<I', body, len(MAGIC))
+    offset = len(MAGIC) + 4
+    try:
+        envelope = json.loads(bytes(body[offset:offset + length]))
+    except ValueError:
+        raise MatrixInputError("Malformed envelope in binary body")
+
+    stream = io.BytesIO(body)
+    arrays = []
+    offset = _aligned(offset + length)
+    while offset < len(body):
+        stream.seek(offset)
+        try:
+            version = np.lib.format.read_magic(stream)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+        except ValueError as e:
+            raise MatrixInputError(f"Malformed array record {len(arrays)}: {e}")
+        if dtype.hasobject:
+            raise MatrixInputError(f"Array record {len(arrays)} has an object dtype")
+        count = int(np.prod(shape))
+        start = stream.tell()
+        if start + count * dtype.itemsize > len(body):
+            raise MatrixInputError(f"Array record {len(arrays)} is truncated")
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=start)
+        arrays.append(array.reshape(shape, order='F' if fortran_order else 'C'))
+        offset = _aligned(start + count * dtype.itemsize)
+
+    def walk(value):
+        if isinstance(value, dict):
+            if '$array' in value:
+                index = value['$array']
+                if not isinstance(index, int) or not 0 <= index < len(arrays):
+                    raise MatrixInputError(f"Envelope refers to missing array {index}")
+                return list(arrays[index]) if value.get('split') else arrays[index]
+            return {key: walk(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [walk(item) for item in value]
+        return value
+
+    return walk(envelope)